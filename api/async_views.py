@@ -0,0 +1,104 @@
+"""
+Helpers for async API views.
+
+DRF 3.14 views are sync; under ASGI Django runs each one in a worker thread
+(one per request), so every request pays a thread hop and holds a thread
+while it runs. Read endpoints are therefore plain async Django views that
+reuse DRF serializers, pagination and the API's JSON renderer, so responses
+stay the same.
+"""
+import functools
+from typing import Any, Iterable, NamedTuple, Optional, Sequence
+from django.conf import settings
+from django.http import Http404, HttpRequest, HttpResponse
+from rest_framework import exceptions, status
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from core.catalog import Page, parse_cursor
+from api.renderers import FastJSONRenderer
+
+_renderer = FastJSONRenderer()
+
+
+def render_json(data: Any) -> bytes:
+    """Render data exactly like DRF's Response."""
+    return _renderer.render(data)
+
+
+def json_response(data: Any, status: int = status.HTTP_200_OK) -> HttpResponse:
+    """JSON response rendered exactly like DRF's Response."""
+    return HttpResponse(render_json(data), status=status, content_type='application/json')
+
+
+def async_api_view(methods: Iterable[str]):
+    """Decorator for async views: method check, CSRF exemption and DRF-style errors."""
+    allowed = {method.upper() for method in methods}
+
+    def decorator(view):
+        @functools.wraps(view)
+        async def wrapper(request: HttpRequest, *args, **kwargs) -> HttpResponse:
+            if request.method not in allowed:
+                response = json_response(
+                    {'detail': f'Method "{request.method}" not allowed.'},
+                    status=status.HTTP_405_METHOD_NOT_ALLOWED
+                )
+                response['Allow'] = ', '.join(sorted(allowed))
+                return response
+            try:
+                return await view(request, *args, **kwargs)
+            except Http404:
+                return json_response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+            except exceptions.APIException as e:
+                data = e.detail if isinstance(e.detail, (list, dict)) else {'detail': e.detail}
+                return json_response(data, status=e.status_code)
+
+        # Same as @csrf_exempt, which wraps async views in a sync function in Django 4.2
+        wrapper.csrf_exempt = True
+        return wrapper
+    return decorator
+
+
+def paginated_data(request: HttpRequest, items: Sequence, serializer_class) -> Any:
+    """Serialize items with the default DRF pagination (if configured)."""
+    pagination_class = api_settings.DEFAULT_PAGINATION_CLASS
+    if pagination_class is None:
+        return serializer_class(items, many=True).data
+    paginator = pagination_class()
+    page = paginator.paginate_queryset(items, Request(request))
+    if page is None:
+        return serializer_class(items, many=True).data
+    return paginator.get_paginated_response(serializer_class(page, many=True).data).data
+
+
+class CursorParams(NamedTuple):
+    """Keyset page request: ?cursor= (next page) or ?before= (previous page) and ?limit=."""
+    cursor: Optional[str]
+    backwards: bool
+    limit: int
+
+
+def cursor_params(request: HttpRequest, parts: int) -> CursorParams:
+    """Read cursor pagination parameters (cursors of `parts`-long keys); limit defaults to PAGE_SIZE, capped at API_MAX_PAGE_SIZE."""
+    before = request.GET.get('before')
+    cursor = before or request.GET.get('cursor') or None
+    if cursor is not None and parse_cursor(cursor, parts) is None:
+        raise exceptions.NotFound('Invalid cursor')
+    try:
+        limit = max(1, min(int(request.GET['limit']), settings.API_MAX_PAGE_SIZE))
+    except (KeyError, ValueError):
+        limit = first_page().limit
+    return CursorParams(cursor, bool(before), limit)
+
+
+def first_page() -> CursorParams:
+    """Parameters of a request without ?cursor=, ?before= and ?limit=."""
+    return CursorParams(None, False, min(api_settings.PAGE_SIZE or settings.API_MAX_PAGE_SIZE, settings.API_MAX_PAGE_SIZE))
+
+
+def cursor_page_data(page: Page, serializer_class) -> Any:
+    """Serialized keyset page with the cursors for its neighbours."""
+    return {
+        'next_cursor': page.next_cursor,
+        'prev_cursor': page.prev_cursor,
+        'results': serializer_class(page.items, many=True).data,
+    }
@@ -0,0 +1,120 @@
+"""
+Signed session tokens for the Mini App API.
+
+telegram_auth and bootstrap issue a token after checking initData; later
+requests send `Authorization: Bearer <token>`. The token carries the user id, Telegram id,
+role and expiry and is verified with one HMAC, without a database lookup:
+
+    <user id>.<telegram id>.<role>.<expires, base 36>.<signature>
+"""
+import base64
+import functools
+import hashlib
+import hmac
+import time
+from typing import NamedTuple, Optional
+from django.conf import settings
+from django.utils.http import base36_to_int, int_to_base36
+from rest_framework import authentication, exceptions
+
+TOKEN_KEYWORD = 'Bearer'
+# Expiry is rounded up to this many seconds, so tokens issued to a user within
+# the step are identical and responses embedding one (bootstrap) keep their ETag
+TOKEN_EXPIRY_STEP = 3600
+
+
+class TokenUser(NamedTuple):
+    """Identity from a verified token; stands in for request.user without a query."""
+    id: int
+    telegram_id: int
+    role: str
+
+    @property
+    def pk(self) -> int:
+        return self.id
+
+    @property
+    def is_authenticated(self) -> bool:
+        return True
+
+    @property
+    def is_anonymous(self) -> bool:
+        return False
+
+
+@functools.lru_cache(maxsize=1)
+def _signing_key(secret_key: str) -> bytes:
+    """HMAC key for tokens, derived once per SECRET_KEY."""
+    return hashlib.sha256(b'api.authentication.token' + secret_key.encode()).digest()
+
+
+def _signature(payload: str) -> str:
+    digest = hmac.new(_signing_key(settings.SECRET_KEY), payload.encode(), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b'=').decode()
+
+
+def issue_token(user, ttl: Optional[int] = None) -> str:
+    """Signed token for a user, valid for at least `ttl` seconds (API_TOKEN_TTL by default)."""
+    expires = int(time.time()) + (settings.API_TOKEN_TTL if ttl is None else ttl)
+    expires += -expires % TOKEN_EXPIRY_STEP
+    payload = f'{user.id}.{user.telegram_id or 0}.{user.role}.{int_to_base36(expires)}'
+    return f'{payload}.{_signature(payload)}'
+
+
+def read_token(token: str) -> Optional[TokenUser]:
+    """Identity of a valid, unexpired token, else None."""
+    payload, _, signature = token.rpartition('.')
+    if not hmac.compare_digest(_signature(payload).encode(), signature.encode()):
+        return None
+    try:
+        user_id, telegram_id, role, expires = payload.split('.')
+        if base36_to_int(expires) < time.time():
+            return None
+        return TokenUser(id=int(user_id), telegram_id=int(telegram_id), role=role)
+    except ValueError:
+        return None
+
+
+class TelegramTokenAuthentication(authentication.BaseAuthentication):
+    """DRF authentication by a token from issue_token(); no database access."""
+
+    def authenticate(self, request):
+        header = authentication.get_authorization_header(request).split()
+        if not header or header[0].lower() != TOKEN_KEYWORD.lower().encode():
+            return None
+        if len(header) != 2:
+            raise exceptions.AuthenticationFailed('Invalid token header.')
+
+        user = read_token(header[1].decode(errors='replace'))
+        if user is None:
+            raise exceptions.AuthenticationFailed('Invalid or expired token.')
+        return user, header[1].decode()
+
+    def authenticate_header(self, request):
+        return TOKEN_KEYWORD
+
+
+class TelegramInitDataAuthentication(authentication.BaseAuthentication):
+    """DRF authentication by `Authorization: tma <initData>`, for clients without a token yet."""
+
+    def authenticate(self, request):
+        from api.telegram_auth import get_init_data, get_user_from_init_data
+
+        init_data = get_init_data(request)
+        if not init_data:
+            return None
+        user = get_user_from_init_data(init_data)
+        if user is None:
+            raise exceptions.AuthenticationFailed('Invalid initData')
+        return user, None
+
+
+def can_view_application(user, application) -> bool:
+    """Whether an authenticated user (TokenUser or User) may read an application."""
+    if getattr(user, 'is_staff', False):
+        return True
+    if user.role == 'school':
+        return application.school is not None and application.school.user_id == user.id
+    if user.role == 'instructor':
+        return application.instructor is not None and application.instructor.user_id == user.id
+    return application.student_id == user.id
@@ -0,0 +1,81 @@
+"""
+Mini App bootstrap payload.
+
+One response with everything the Mini App shows first: the user with an
+API token (see api.authentication), active cities, the first pages of
+schools and instructors (per auto type) of the user's city and their open
+applications. Catalog parts are spliced in as pre-rendered JSON from
+api.caching, so only the per-user parts are serialized per request.
+"""
+from typing import List, Optional, Tuple
+from core.catalog import catalog
+from core.models import Application, Instructor, User
+from api.async_views import cursor_page_data, first_page, render_json
+from api.authentication import issue_token
+from api.caching import cached_json
+from api.serializers import (
+    optimize_queryset, ApplicationSerializer, CitySerializer, SchoolValuesSerializer, InstructorValuesSerializer
+)
+from api.telegram_auth import get_user_from_init_data
+
+
+def user_payload(user: User) -> dict:
+    """User fields returned by auth endpoints."""
+    return {
+        'id': user.id,
+        'telegram_id': user.telegram_id,
+        'username': user.username,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+    }
+
+
+def load_user_state(init_data: str) -> Optional[Tuple[User, List[dict]]]:
+    """Authenticate initData and serialize the user's open applications (sync, queries)."""
+    user = get_user_from_init_data(init_data)
+    if not user:
+        return None
+    # Serialized here: a related object missing from select_related would query
+    applications = ApplicationSerializer(optimize_queryset(
+        Application.objects.filter(student=user, status__in=Application.OPEN_STATUSES),
+        ApplicationSerializer
+    ), many=True).data
+    return user, applications
+
+
+def pick_city(requested: Optional[str], user: User, applications: List[dict]) -> Optional[str]:
+    """City to preload: requested, else the user's, else of their latest open application."""
+    for name in (requested, user.city, applications[0]['city_name'] if applications else None):
+        if name and catalog.get_city(name):
+            return name
+    return None
+
+
+def render_bootstrap(user: User, applications: List[dict], city: Optional[str]) -> bytes:
+    """Bootstrap JSON; call after catalog.aensure_fresh()."""
+    cities = cached_json(('bootstrap-cities',), lambda: CitySerializer(catalog.get_cities(), many=True).data)
+    parts = [
+        b'{"user":', render_json(user_payload(user)),
+        b',"token":', render_json(issue_token(user)),
+        b',"city":', render_json(city) if city else b'null',  # DRF renders None as b''
+        b',"cities":', cities.body,
+    ]
+    if city:
+        # First pages, shared with GET /api/schools/ and /api/instructors/ without cursor or limit
+        params = first_page()
+        schools = cached_json(
+            ('schools', city, params),
+            lambda: cursor_page_data(catalog.get_schools_page(city, *params), SchoolValuesSerializer)
+        )
+        parts += [b',"schools":', schools.body, b',"instructors":{']
+        for number, (auto_type, _) in enumerate(Instructor.AUTO_TYPE_CHOICES):
+            instructors = cached_json(
+                ('instructors', city, auto_type, params),
+                lambda: cursor_page_data(catalog.get_instructors_page(city, auto_type, *params), InstructorValuesSerializer)
+            )
+            parts += [b',' if number else b'', render_json(auto_type), b':', instructors.body]
+        parts.append(b'}')
+    else:
+        parts.append(b',"schools":null,"instructors":null')
+    parts += [b',"applications":', render_json(applications), b'}']
+    return b''.join(parts)
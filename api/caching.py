@@ -0,0 +1,63 @@
+"""
+Cached, conditional responses for catalog endpoints.
+
+Rendered bodies are kept per catalog version and request parameters, so
+repeat requests cost neither a query nor serialization. Responses carry an
+ETag and Last-Modified; clients and nginx revalidate with If-None-Match /
+If-Modified-Since and get 304 while the catalog is unchanged. Saving a
+City, School or Instructor bumps the catalog version (see core.signals),
+which retires the cached bodies.
+"""
+import hashlib
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, NamedTuple
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from api.async_views import render_json
+from core.catalog import catalog
+
+# Rendered bodies kept in memory; older entries are evicted first
+RESPONSE_CACHE_SIZE = 256
+
+
+class CachedBody(NamedTuple):
+    body: bytes
+    etag: str
+
+
+_responses: "OrderedDict[Hashable, CachedBody]" = OrderedDict()
+
+
+def content_etag(body: bytes) -> str:
+    """Strong ETag derived from the body, so unrelated catalog changes keep copies valid."""
+    return '"%s"' % hashlib.blake2b(body, digest_size=10).hexdigest()
+
+
+def cached_json(key: Hashable, render: Callable[[], Any]) -> CachedBody:
+    """Rendered JSON of render() for the current catalog version; call after catalog.aensure_fresh()."""
+    key = (catalog.version, key)
+    try:
+        _responses.move_to_end(key)
+        return _responses[key]
+    except KeyError:
+        pass
+    body = render_json(render())
+    cached = _responses[key] = CachedBody(body, content_etag(body))
+    if len(_responses) > RESPONSE_CACHE_SIZE:
+        _responses.popitem(last=False)
+    return cached
+
+
+def catalog_response(request: HttpRequest, key: Hashable, render: Callable[[], Any]) -> HttpResponse:
+    """Cached, conditional JSON response of render(); call after catalog.aensure_fresh()."""
+    cached = cached_json(key, render)
+    response = HttpResponse(cached.body, content_type='application/json')
+    response['ETag'] = cached.etag
+    last_modified = None
+    if catalog.updated_at is not None:
+        last_modified = int(catalog.updated_at.timestamp())
+        response['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, public=True, max_age=settings.API_CACHE_MAX_AGE)
+    return get_conditional_response(request, etag=cached.etag, last_modified=last_modified, response=response)
@@ -1,11 +1,24 @@
 """
 Serializers for API.
 """
+from decimal import Decimal
+from operator import attrgetter
+from typing import Callable, List, Optional, Sequence, Tuple
 from rest_framework import serializers
-from core.models import City, School, Instructor, Application, User
+from core.models import City, School, Instructor, Application
 from django.db import models
 
 
+def optimize_queryset(queryset: models.QuerySet, serializer_class) -> models.QuerySet:
+    """Fetch the related objects serializer_class reads (Meta.select_related / prefetch_related) up front."""
+    meta = serializer_class.Meta
+    if getattr(meta, 'select_related', None):
+        queryset = queryset.select_related(*meta.select_related)
+    if getattr(meta, 'prefetch_related', None):
+        queryset = queryset.prefetch_related(*meta.prefetch_related)
+    return queryset
+
+
 class CitySerializer(serializers.ModelSerializer):
     """Serializer for City model."""
     
@@ -25,6 +38,7 @@ class SchoolSerializer(serializers.ModelSerializer):
             'rating', 'trust_index', 'whatsapp', 'telegram_contact',
             'payment_link_kaspi', 'payment_link_halyk', 'is_active'
         ]
+        select_related = ['city']  # city_name
 
 
 class InstructorSerializer(serializers.ModelSerializer):
@@ -39,6 +53,84 @@ class InstructorSerializer(serializers.ModelSerializer):
             'auto_type_display', 'phone', 'rating',
             'payment_link_kaspi', 'payment_link_halyk', 'is_active'
         ]
+        select_related = ['city']  # city_name
+
+
+def decimal_string(decimal_places: int) -> Callable:
+    """Converter formatting a Decimal like serializers.DecimalField."""
+    exponent = Decimal('.1') ** decimal_places
+    return lambda value: '' if value is None else '{:f}'.format(value.quantize(exponent))
+
+
+class ValuesSerializer:
+    """
+    Read-only serializer over plain field lookups, without DRF field machinery.
+    
+    `fields` lists (output name, ORM lookup, converter or None). Rows come
+    straight from values_list() for querysets, or from attributes of loaded
+    instances ('city__name' -> instance.city.name). Output matches the
+    ModelSerializer it mirrors.
+    """
+    fields: Sequence[Tuple[str, str, Optional[Callable]]] = ()
+
+    def __init__(self, instance=None, many: bool = False):
+        self.instance = instance
+        self.many = many
+
+    @property
+    def data(self):
+        getters = [attrgetter(lookup.replace('__', '.')) for _, lookup, _ in self.fields]
+        if self.many:
+            return [self._build(tuple(getter(item) for getter in getters)) for item in self.instance]
+        return self._build(tuple(getter(self.instance) for getter in getters))
+
+    @classmethod
+    def from_queryset(cls, queryset: models.QuerySet) -> List[dict]:
+        """Serialize a queryset from values_list() rows; no model instances are built."""
+        rows = queryset.values_list(*(lookup for _, lookup, _ in cls.fields))
+        return [cls._build(row) for row in rows]
+
+    @classmethod
+    def _build(cls, row: tuple) -> dict:
+        return {
+            name: convert(value) if convert else value
+            for (name, _, convert), value in zip(cls.fields, row)
+        }
+
+
+class SchoolValuesSerializer(ValuesSerializer):
+    """Fast SchoolSerializer for catalog reads."""
+    fields = (
+        ('id', 'id', None),
+        ('name', 'name', None),
+        ('city', 'city_id', None),
+        ('city_name', 'city__name', None),
+        ('address', 'address', None),
+        ('rating', 'rating', decimal_string(2)),
+        ('trust_index', 'trust_index', decimal_string(2)),
+        ('whatsapp', 'whatsapp', None),
+        ('telegram_contact', 'telegram_contact', None),
+        ('payment_link_kaspi', 'payment_link_kaspi', None),
+        ('payment_link_halyk', 'payment_link_halyk', None),
+        ('is_active', 'is_active', None),
+    )
+
+
+class InstructorValuesSerializer(ValuesSerializer):
+    """Fast InstructorSerializer for catalog reads."""
+    fields = (
+        ('id', 'id', None),
+        ('name', 'name', None),
+        ('city', 'city_id', None),
+        ('city_name', 'city__name', None),
+        ('auto_type', 'auto_type', None),
+        ('auto_type_display', 'auto_type', lambda value, labels=dict(Instructor.AUTO_TYPE_CHOICES): labels.get(value, value)),
+        ('phone', 'phone', None),
+        ('rating', 'rating', decimal_string(2)),
+        ('payment_link_kaspi', 'payment_link_kaspi', None),
+        ('payment_link_halyk', 'payment_link_halyk', None),
+        ('is_active', 'is_active', None),
+    )
 
 
 class ApplicationSerializer(serializers.ModelSerializer):
@@ -70,35 +162,25 @@ class ApplicationSerializer(serializers.ModelSerializer):
             'student_phone', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
+        select_related = ['school', 'instructor', 'city']  # *_name
 
 
 class ApplicationCreateSerializer(serializers.ModelSerializer):
-    """Serializer for creating applications."""
-    telegram_id = serializers.IntegerField(write_only=True)
+    """Serializer for creating applications; the view passes the student as context['student_id']."""
     
     class Meta:
         model = Application
         fields = [
-            'telegram_id', 'school', 'instructor', 'city', 'category', 
+            'school', 'instructor', 'city', 'category', 
             'format', 'time_slot', 'student_name', 'student_phone'
         ]
     
     def create(self, validated_data):
-        telegram_id = validated_data.pop('telegram_id')
         student_name = validated_data.pop('student_name')
         student_phone = validated_data.pop('student_phone')
         
-        # Get or create user
-        user, _ = User.objects.get_or_create(
-            telegram_id=telegram_id,
-            defaults={
-                'username': f'user_{telegram_id}',
-                'role': 'student'
-            }
-        )
-        
         application = Application.objects.create(
-            student=user,
+            student_id=self.context['student_id'],
             student_name=student_name,
             student_phone=student_phone,
             status='new',
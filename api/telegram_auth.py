@@ -1,71 +1,113 @@
 """
 Telegram Web App authentication utilities.
 """
+import functools
 import hashlib
 import hmac
+import json
+import time
+from collections import OrderedDict
+from typing import Optional
 from urllib.parse import parse_qsl
 from django.conf import settings
 from bot.config import TELEGRAM_BOT_TOKEN
 
 
+# Verified initData strings remembered per process; older entries are evicted first
+INIT_DATA_CACHE_SIZE = 1024
+
+_verified: "OrderedDict[str, dict]" = OrderedDict()
+
+# Authorization header scheme used by Telegram Mini Apps: "tma <initData>"
+INIT_DATA_SCHEME = 'tma '
+
+
+def get_init_data(request) -> str:
+    """initData from the `Authorization: tma <initData>` header, or ''."""
+    header = request.headers.get('Authorization', '')
+    if header.startswith(INIT_DATA_SCHEME):
+        return header[len(INIT_DATA_SCHEME):]
+    return ''
+
+
 def validate_telegram_init_data(init_data: str) -> dict:
     """
     Validate Telegram Web App initData.
     
+    Verified strings are remembered (LRU), so the repeated calls the Mini App
+    makes with the same initData skip parsing and the HMAC; auth_date
+    freshness is still checked on every call.
+    
     Args:
         init_data: Raw initData string from Telegram Web App
         
     Returns:
         dict: Parsed and validated user data, or None if invalid
     """
+    validated = _verified.get(init_data)
+    if validated is None:
+        validated = _verify(init_data)
+        if validated is None:
+            return None
+        _verified[init_data] = validated
+        if len(_verified) > INIT_DATA_CACHE_SIZE:
+            _verified.popitem(last=False)
+    else:
+        try:
+            _verified.move_to_end(init_data)
+        except KeyError:
+            pass  # Evicted by another thread meanwhile
+    
+    max_age = settings.TELEGRAM_INIT_DATA_MAX_AGE
+    if max_age and time.time() - validated['auth_date'] > max_age:
+        return None
+    return validated
+
+
+def _verify(init_data: str) -> Optional[dict]:
+    """Check the initData signature and parse it."""
     try:
-        # Parse init_data
         parsed_data = dict(parse_qsl(init_data))
         
-        # Extract hash
         received_hash = parsed_data.pop('hash', '')
         if not received_hash:
             return None
         
-        # Create data check string
         data_check_string = '\n'.join(
             f"{key}={value}" 
             for key, value in sorted(parsed_data.items())
         )
-        
-        # Calculate secret key
-        secret_key = hmac.new(
-            key=b"WebAppData",
-            msg=TELEGRAM_BOT_TOKEN.encode(),
-            digestmod=hashlib.sha256
-        ).digest()
-        
-        # Calculate hash
         calculated_hash = hmac.new(
-            key=secret_key,
+            key=_secret_key(TELEGRAM_BOT_TOKEN),
             msg=data_check_string.encode(),
             digestmod=hashlib.sha256
         ).hexdigest()
-        
-        # Verify hash
-        if calculated_hash != received_hash:
+        if not hmac.compare_digest(calculated_hash, received_hash):
             return None
         
-        # Parse user data
         user_data = {}
         if 'user' in parsed_data:
-            import json
             user_data = json.loads(parsed_data['user'])
         
         return {
             'user': user_data,
-            'auth_date': parsed_data.get('auth_date'),
+            'auth_date': int(parsed_data['auth_date']),
             'query_id': parsed_data.get('query_id'),
         }
-    except Exception as e:
+    except Exception:
         return None
 
 
+@functools.lru_cache(maxsize=1)
+def _secret_key(bot_token: str) -> bytes:
+    """HMAC key for initData signatures, derived once per bot token."""
+    return hmac.new(
+        key=b"WebAppData",
+        msg=bot_token.encode(),
+        digestmod=hashlib.sha256
+    ).digest()
+
+
 def get_user_from_init_data(init_data: str):
     """
     Get or create user from Telegram initData.
@@ -96,15 +138,15 @@ def get_user_from_init_data(init_data: str):
         }
     )
     
-    # Update user info if exists
+    # Update user info if it changed in Telegram
     if not created:
-        if user_data.get('first_name'):
-            user.first_name = user_data['first_name']
-        if user_data.get('last_name'):
-            user.last_name = user_data['last_name']
-        if user_data.get('username'):
-            user.username = user_data['username']
-        user.save()
+        changed = [
+            field for field in ('first_name', 'last_name', 'username')
+            if user_data.get(field) and getattr(user, field) != user_data[field]
+        ]
+        if changed:
+            for field in changed:
+                setattr(user, field, user_data[field])
+            user.save(update_fields=changed)
     
     return user
-
@@ -1,73 +1,88 @@
 """
 API views.
+
+Read endpoints and Telegram auth are async (see api.async_views); the rest
+are regular DRF views.
 """
-from rest_framework import viewsets, status
+from asgiref.sync import sync_to_async
+from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.request import Request
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from django.http import Http404, HttpResponse
 from django.shortcuts import get_object_or_404
-from core.models import City, School, Instructor, Application
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from core.models import Application
+from core.catalog import catalog, INSTRUCTOR_KEY_PARTS, SCHOOL_KEY_PARTS
+from api.authentication import can_view_application, issue_token
+from api.async_views import async_api_view, cursor_page_data, cursor_params, json_response, paginated_data
+from api.telegram_auth import get_init_data
+from api.bootstrap import load_user_state, pick_city, render_bootstrap, user_payload
+from api.caching import catalog_response, content_etag
 from api.serializers import (
-    CitySerializer, SchoolSerializer, InstructorSerializer,
+    optimize_queryset, CitySerializer, SchoolValuesSerializer, InstructorValuesSerializer,
     ApplicationSerializer, ApplicationCreateSerializer
 )
 
 
-class CityViewSet(viewsets.ReadOnlyModelViewSet):
-    """ViewSet for cities."""
-    queryset = City.objects.filter(is_active=True)
-    serializer_class = CitySerializer
-    permission_classes = [AllowAny]
+@async_api_view(['GET'])
+async def cities_list(request):
+    """List active cities from the catalog cache."""
+    await catalog.aensure_fresh()
+    # Pagination links are absolute, so the whole URL is the key
+    return catalog_response(
+        request,
+        ('cities', request.build_absolute_uri()),
+        lambda: paginated_data(request, catalog.get_cities(), CitySerializer)
+    )
 
 
-@api_view(['GET'])
-@permission_classes([AllowAny])
-def schools_list(request):
-    """Get schools filtered by city."""
-    city_name = request.query_params.get('city', None)
-    
-    if city_name:
-        try:
-            city = City.objects.get(name=city_name, is_active=True)
-            schools = School.objects.filter(city=city, is_active=True).order_by('-rating', '-trust_index')
-        except City.DoesNotExist:
-            schools = School.objects.none()
-    else:
-        schools = School.objects.filter(is_active=True).order_by('-rating', '-trust_index')
-    
-    serializer = SchoolSerializer(schools, many=True)
-    return Response(serializer.data)
+@async_api_view(['GET'])
+async def city_detail(request, pk):
+    """Get an active city."""
+    await catalog.aensure_fresh()
+    for city in catalog.get_cities():
+        if city.id == pk:
+            return catalog_response(request, ('city', pk), lambda: CitySerializer(city).data)
+    raise Http404
 
 
-@api_view(['GET'])
-@permission_classes([AllowAny])
-def instructors_list(request):
-    """Get instructors filtered by city and auto type."""
-    city_name = request.query_params.get('city', None)
-    auto_type = request.query_params.get('auto_type', None)
+@async_api_view(['GET'])
+async def schools_list(request):
+    """Keyset page of schools filtered by city, ordered by rating and trust index."""
+    city_name = request.GET.get('city', None) or None
+    params = cursor_params(request, SCHOOL_KEY_PARTS)
     
-    instructors = Instructor.objects.filter(is_active=True)
-    
-    if city_name:
-        try:
-            city = City.objects.get(name=city_name, is_active=True)
-            instructors = instructors.filter(city=city)
-        except City.DoesNotExist:
-            instructors = Instructor.objects.none()
-    
-    if auto_type:
-        instructors = instructors.filter(auto_type=auto_type)
+    await catalog.aensure_fresh()
+    return catalog_response(
+        request,
+        ('schools', city_name, params),
+        lambda: cursor_page_data(catalog.get_schools_page(city_name, *params), SchoolValuesSerializer)
+    )
+
+
+@async_api_view(['GET'])
+async def instructors_list(request):
+    """Keyset page of instructors filtered by city and auto type, ordered by rating."""
+    city_name = request.GET.get('city', None) or None
+    auto_type = request.GET.get('auto_type', None) or None
+    params = cursor_params(request, INSTRUCTOR_KEY_PARTS)
     
-    instructors = instructors.order_by('-rating')
-    serializer = InstructorSerializer(instructors, many=True)
-    return Response(serializer.data)
+    await catalog.aensure_fresh()
+    return catalog_response(
+        request,
+        ('instructors', city_name, auto_type, params),
+        lambda: cursor_page_data(catalog.get_instructors_page(city_name, auto_type, *params), InstructorValuesSerializer)
+    )
 
 
 @api_view(['POST'])
-@permission_classes([AllowAny])
+@permission_classes([IsAuthenticated])
 def application_create(request):
-    """Create a new application."""
-    serializer = ApplicationCreateSerializer(data=request.data)
+    """Create a new application for the authenticated student."""
+    serializer = ApplicationCreateSerializer(data=request.data, context={'student_id': request.user.id})
     
     if serializer.is_valid():
         application = serializer.save()
@@ -78,44 +93,71 @@ def application_create(request):
 
 
 @api_view(['GET'])
-@permission_classes([AllowAny])
+@permission_classes([IsAuthenticated])
 def application_detail(request, pk):
-    """Get application details."""
-    application = get_object_or_404(Application, pk=pk)
+    """Get details of an application the user is part of."""
+    application = get_object_or_404(optimize_queryset(Application.objects.all(), ApplicationSerializer), pk=pk)
+    if not can_view_application(request.user, application):
+        raise Http404
     serializer = ApplicationSerializer(application)
     return Response(serializer.data)
 
 
-@api_view(['POST'])
-@permission_classes([AllowAny])
-def telegram_auth(request):
+@async_api_view(['POST'])
+async def telegram_auth(request):
     """Authenticate user via Telegram Web App initData."""
     from api.telegram_auth import get_user_from_init_data
     
-    init_data = request.data.get('initData', '')
+    data = Request(request, parsers=[parser() for parser in api_settings.DEFAULT_PARSER_CLASSES]).data
+    init_data = data.get('initData', '')
     
     if not init_data:
-        return Response({
+        return json_response({
             'success': False,
             'error': 'initData is required'
         }, status=status.HTTP_400_BAD_REQUEST)
     
-    user = get_user_from_init_data(init_data)
+    user = await sync_to_async(get_user_from_init_data)(init_data)
     
     if not user:
-        return Response({
+        return json_response({
             'success': False,
             'error': 'Invalid initData'
         }, status=status.HTTP_401_UNAUTHORIZED)
     
-    return Response({
+    return json_response({
         'success': True,
-        'user': {
-            'id': user.id,
-            'telegram_id': user.telegram_id,
-            'username': user.username,
-            'first_name': user.first_name,
-            'last_name': user.last_name,
-        }
+        'user': user_payload(user),
+        'token': issue_token(user)
     })
 
+
+@async_api_view(['GET'])
+async def bootstrap(request):
+    """Mini App start data in one request; initData comes in `Authorization: tma <initData>`."""
+    init_data = get_init_data(request)
+    if not init_data:
+        return json_response({
+            'success': False,
+            'error': 'initData is required'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    state = await sync_to_async(load_user_state)(init_data)
+    if not state:
+        return json_response({
+            'success': False,
+            'error': 'Invalid initData'
+        }, status=status.HTTP_401_UNAUTHORIZED)
+    user, applications = state
+    
+    await catalog.aensure_fresh()
+    city = pick_city(request.GET.get('city'), user, applications)
+    body = render_bootstrap(user, applications, city)
+    
+    # Per-user payload: browsers may keep it but must revalidate (304 if unchanged)
+    response = HttpResponse(body, content_type='application/json')
+    etag = content_etag(body)
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ['Authorization'])
+    return get_conditional_response(request, etag=etag, response=response)
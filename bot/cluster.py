@@ -0,0 +1,324 @@
+"""
+Sharded bot runner: one front process and BOT_SHARDS worker processes.
+
+The front receives updates (long polling, or a webhook when WEBHOOK_URL is
+set) and forwards each one over a Unix socket to the worker chosen by the
+sender's user id, so all updates of a user are handled in order by the same
+process (FSM lock, throttling and per-user state stay process-local). Every
+worker is a regular WebhookServer with its own event loop, ORM threads and
+database connections.
+
+    BOT_SHARDS=4 python -m bot.cluster
+
+Worker metrics are served on METRICS_PORT + 1 + shard index.
+"""
+import asyncio
+import hmac
+import json
+import logging
+import multiprocessing
+import os
+import signal
+from time import monotonic
+from typing import List, Optional
+import aiohttp
+from aiohttp import web
+from aiogram.client.telegram import PRODUCTION, TelegramAPIServer
+from bot.config import (
+    TELEGRAM_BOT_TOKEN, TELEGRAM_API_URL, WEBHOOK_URL, WEBHOOK_PATH, WEBHOOK_SECRET,
+    WEBHOOK_HOST, WEBHOOK_PORT, WEBHOOK_WORKERS, OUTBOX_GLOBAL_RATE, METRICS_PORT,
+    BOT_SHARDS, BOT_SHARD_SOCKET_DIR, BOT_SHUTDOWN_TIMEOUT
+)
+from bot.dispatcher import create_dispatcher
+from bot.services.telegram_client import create_bot, get_bot, set_bot
+from bot.webhook import WebhookServer, SECRET_HEADER
+
+logger = logging.getLogger(__name__)
+
+# Long polling timeout of the front, seconds
+POLL_TIMEOUT = 30
+# Worker path that accepts forwarded updates
+UPDATE_PATH = '/update'
+
+
+def shard_key(update: dict) -> int:
+    """Routing key of a raw update: sender id, else chat id, else update id."""
+    for value in update.values():
+        if isinstance(value, dict):
+            user = value.get('from') or value.get('user')
+            if user:
+                return user['id']
+            chat = value.get('chat')
+            if chat:
+                return chat['id']
+    return update.get('update_id', 0)
+
+
+def socket_path(index: int, socket_dir: str = BOT_SHARD_SOCKET_DIR) -> str:
+    return os.path.join(socket_dir, f'bot-{index}.sock')
+
+
+def run_worker(index: int, shards: int, path: str):
+    """Worker process: handle updates forwarded to a Unix socket."""
+    # Ctrl+C in a terminal reaches only the front, which stops workers in order
+    os.setpgrp()
+    # The global Bot API budget is shared by all workers
+    bot = create_bot(global_rate=OUTBOX_GLOBAL_RATE / shards)
+    set_bot(bot)
+    dp = create_dispatcher(metrics_port=METRICS_PORT + 1 + index if METRICS_PORT else 0)
+    server = WebhookServer(bot, dp, secret='', webhook_url='', workers=max(1, WEBHOOK_WORKERS // shards))
+    app = server.create_app(path=UPDATE_PATH)
+
+    if index == 0 and hasattr(dp.storage, 'purge_expired'):
+        # Drop conversations abandoned longer than the TTL
+        async def purge_expired(app: web.Application):
+            await dp.storage.purge_expired()
+        app.on_startup.append(purge_expired)
+
+    logger.info("Shard %s/%s listening on %s", index, shards, path)
+    web.run_app(app, path=path, print=None, access_log=None)
+
+
+class ShardRouter:
+    """Forwards raw updates to worker sockets over one ordered lane per shard."""
+
+    def __init__(self, paths: List[str], retry: bool):
+        self.paths = paths
+        self.retry = retry  # Polling: keep retrying while the worker is unavailable
+        self.lanes = [asyncio.Queue() for _ in paths]
+        self._sessions: List[aiohttp.ClientSession] = []
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self):
+        self._sessions = [
+            aiohttp.ClientSession(connector=aiohttp.UnixConnector(path=path)) for path in self.paths
+        ]
+        self._tasks = [asyncio.create_task(self._lane(index)) for index in range(len(self.paths))]
+
+    def route(self, body: bytes, update: dict) -> asyncio.Future:
+        """Queue an update for its shard; the future resolves to the worker's HTTP status."""
+        future = asyncio.get_running_loop().create_future()
+        self.lanes[shard_key(update) % len(self.lanes)].put_nowait((body, future))
+        return future
+
+    async def _post(self, index: int, body: bytes) -> int:
+        try:
+            async with self._sessions[index].post(
+                f'http://shard{UPDATE_PATH}', data=body, headers={'Content-Type': 'application/json'}
+            ) as response:
+                return response.status
+        except aiohttp.ClientError:
+            return 503  # Worker is (re)starting
+
+    async def _lane(self, index: int):
+        queue = self.lanes[index]
+        while True:
+            body, future = await queue.get()
+            try:
+                status = await self._post(index, body)
+                while status == 503 and self.retry:
+                    await asyncio.sleep(1)
+                    status = await self._post(index, body)
+                if status != 200 and status != 503:
+                    # Rejected by the worker (bad update, handler bug): resending won't help
+                    logger.error("Shard %s answered %s, update dropped", index, status)
+                future.set_result(status)
+            finally:
+                queue.task_done()
+
+    async def stop(self, timeout: float):
+        """Forward what is queued within `timeout`, then close lanes."""
+        try:
+            await asyncio.wait_for(asyncio.gather(*(lane.join() for lane in self.lanes)), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Shutdown timeout: %s updates not forwarded", sum(lane.qsize() for lane in self.lanes))
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        for session in self._sessions:
+            await session.close()
+
+
+class Supervisor:
+    """Starts worker processes and restarts the ones that die."""
+
+    def __init__(self, shards: int = BOT_SHARDS, socket_dir: str = BOT_SHARD_SOCKET_DIR):
+        self.shards = shards
+        self.paths = [socket_path(index, socket_dir) for index in range(shards)]
+        self.processes: List[Optional[multiprocessing.Process]] = [None] * shards
+        self.stopping = False
+        # Fresh interpreters: no event loop, DB connections or threads inherited from the front
+        self._context = multiprocessing.get_context('spawn')
+        os.makedirs(socket_dir, exist_ok=True)
+
+    def _spawn(self, index: int):
+        if os.path.exists(self.paths[index]):
+            os.unlink(self.paths[index])
+        process = self._context.Process(
+            target=run_worker, args=(index, self.shards, self.paths[index]), name=f'bot-shard-{index}'
+        )
+        process.start()
+        self.processes[index] = process
+
+    def start(self):
+        for index in range(self.shards):
+            self._spawn(index)
+
+    async def wait_ready(self, timeout: float = 60):
+        """Wait until every worker listens on its socket."""
+        deadline = monotonic() + timeout
+        while not all(os.path.exists(path) for path in self.paths):
+            if monotonic() > deadline:
+                raise RuntimeError("Bot workers did not start in time")
+            await asyncio.sleep(0.1)
+
+    async def watch(self):
+        """Restart workers that exit unexpectedly."""
+        while not self.stopping:
+            for index, process in enumerate(self.processes):
+                if not process.is_alive() and not self.stopping:
+                    logger.error("Shard %s exited with code %s, restarting", index, process.exitcode)
+                    self._spawn(index)
+            await asyncio.sleep(1)
+
+    async def stop(self, timeout: float):
+        """SIGTERM workers (each drains like a single bot process) and wait for them."""
+        self.stopping = True
+        for process in self.processes:
+            if process.is_alive():
+                process.terminate()
+        deadline = monotonic() + timeout
+        loop = asyncio.get_running_loop()
+        for process in self.processes:
+            await loop.run_in_executor(None, process.join, max(0.0, deadline - monotonic()))
+            if process.is_alive():
+                logger.warning("%s did not stop in time, killing", process.name)
+                process.kill()
+
+
+class Front:
+    """Receives updates from Telegram and routes them to shards."""
+
+    def __init__(self, supervisor: Supervisor):
+        self.supervisor = supervisor
+        self.router = ShardRouter(supervisor.paths, retry=not WEBHOOK_URL)
+        self.secret = WEBHOOK_SECRET
+        self.offset: Optional[int] = None
+        self._stop = asyncio.Event()
+
+    async def handle_update(self, request: web.Request) -> web.Response:
+        """Webhook: forward an update and answer with the worker's status."""
+        if self.secret:
+            received = request.headers.get(SECRET_HEADER, '')
+            if not hmac.compare_digest(received, self.secret):
+                return web.Response(status=401)
+        if self._stop.is_set():
+            return web.Response(status=503, headers={'Retry-After': '1'})
+
+        body = await request.read()
+        try:
+            update = json.loads(body)
+        except ValueError:
+            return web.Response(status=400)
+
+        status = await self.router.route(body, update)
+        if status == 503:
+            # Backpressure from the worker: Telegram redelivers the update later
+            return web.Response(status=503, headers={'Retry-After': '1'})
+        return web.Response(status=status)
+
+    async def _get_updates(self, session: aiohttp.ClientSession, url: str, allowed_updates: List[str], timeout: int) -> list:
+        params = {'timeout': timeout, 'allowed_updates': allowed_updates}
+        if self.offset is not None:
+            params['offset'] = self.offset
+        async with session.post(url, json=params, timeout=aiohttp.ClientTimeout(total=timeout + 10)) as response:
+            data = await response.json()
+        if not data.get('ok'):
+            raise RuntimeError(data.get('description', 'getUpdates failed'))
+        return data['result']
+
+    async def poll(self, allowed_updates: List[str]):
+        """Long polling: fetch raw updates and forward them without parsing into models."""
+        server = TelegramAPIServer.from_base(TELEGRAM_API_URL) if TELEGRAM_API_URL else PRODUCTION
+        url = server.api_url(token=TELEGRAM_BOT_TOKEN, method='getUpdates')
+        stopped = asyncio.create_task(self._stop.wait())
+        async with aiohttp.ClientSession() as session:
+            while not self._stop.is_set():
+                fetch = asyncio.create_task(self._get_updates(session, url, allowed_updates, POLL_TIMEOUT))
+                await asyncio.wait({fetch, stopped}, return_when=asyncio.FIRST_COMPLETED)
+                if not fetch.done():
+                    # Not confirmed, so Telegram delivers these updates again after restart
+                    fetch.cancel()
+                    break
+                try:
+                    updates = fetch.result()
+                except Exception as e:
+                    logger.error("Failed to fetch updates: %s", e)
+                    await asyncio.sleep(5)
+                    continue
+                futures = [
+                    self.router.route(json.dumps(update).encode(), update) for update in updates
+                ]
+                await asyncio.gather(*futures)
+                if updates:
+                    self.offset = updates[-1]['update_id'] + 1
+
+            stopped.cancel()
+            # Confirm the last forwarded update
+            if self.offset is not None:
+                try:
+                    await self._get_updates(session, url, allowed_updates, 0)
+                except Exception as e:
+                    logger.warning("Failed to confirm update offset: %s", e)
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(signum, self._stop.set)
+
+        self.supervisor.start()
+        watch = asyncio.create_task(self.supervisor.watch())
+        await self.supervisor.wait_ready()
+        self.router.start()
+        allowed_updates = create_dispatcher(metrics_port=0).resolve_used_update_types()
+        logger.info("Bot cluster started with %s shards", self.supervisor.shards)
+
+        runner = None
+        if WEBHOOK_URL:
+            app = web.Application()
+            app.router.add_post(WEBHOOK_PATH, self.handle_update)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            await web.TCPSite(runner, WEBHOOK_HOST, WEBHOOK_PORT).start()
+            bot = get_bot()
+            await bot.set_webhook(
+                url=WEBHOOK_URL.rstrip('/') + WEBHOOK_PATH,
+                secret_token=self.secret or None,
+                allowed_updates=allowed_updates,
+                max_connections=WEBHOOK_WORKERS
+            )
+            await bot.session.close()
+            logger.info("Webhook registered at %s", WEBHOOK_URL)
+            await self._stop.wait()
+        else:
+            await self.poll(allowed_updates)
+
+        # Stop taking updates, hand the accepted ones to workers, then let workers drain
+        logger.info("Stopping bot cluster")
+        await self.router.stop(BOT_SHUTDOWN_TIMEOUT)
+        if runner is not None:
+            await runner.cleanup()
+        watch.cancel()
+        await self.supervisor.stop(BOT_SHUTDOWN_TIMEOUT + 5)
+
+
+def main():
+    """Run sharded bot."""
+    if not TELEGRAM_BOT_TOKEN:
+        logger.error("TELEGRAM_BOT_TOKEN not set in environment variables!")
+        return
+    asyncio.run(Front(Supervisor()).run())
+
+
+if __name__ == '__main__':
+    main()
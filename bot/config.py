@@ -8,6 +8,31 @@ load_dotenv()
 
 TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN', '')
 
+# Custom Bot API server base URL (local Bot API or a fake server for tests)
+TELEGRAM_API_URL = os.getenv('TELEGRAM_API_URL', '')
+
+# FSM storage backend: 'db' (Django database), 'redis' or 'memory'
+FSM_STORAGE = os.getenv('FSM_STORAGE', 'db')
+FSM_STATE_TTL = int(os.getenv('FSM_STATE_TTL', 7 * 24 * 3600))  # Seconds
+REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+
+# Webhook mode (python -m bot.webhook)
+WEBHOOK_URL = os.getenv('WEBHOOK_URL', '')  # Public base URL; empty = don't register
+WEBHOOK_PATH = os.getenv('WEBHOOK_PATH', '/webhook')
+WEBHOOK_SECRET = os.getenv('WEBHOOK_SECRET', '')
+WEBHOOK_HOST = os.getenv('WEBHOOK_HOST', '0.0.0.0')
+WEBHOOK_PORT = int(os.getenv('WEBHOOK_PORT', 8080))
+WEBHOOK_WORKERS = int(os.getenv('WEBHOOK_WORKERS', 16))
+WEBHOOK_QUEUE_SIZE = int(os.getenv('WEBHOOK_QUEUE_SIZE', 1000))
+
+# Outbound rate limits (Telegram allows ~30 msg/s overall and ~1 msg/s per chat)
+OUTBOX_GLOBAL_RATE = float(os.getenv('OUTBOX_GLOBAL_RATE', 30))
+OUTBOX_CHAT_RATE = float(os.getenv('OUTBOX_CHAT_RATE', 1))
+OUTBOX_CHAT_BURST = int(os.getenv('OUTBOX_CHAT_BURST', 3))
+OUTBOX_WORKERS = int(os.getenv('OUTBOX_WORKERS', 4))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', 5))
+OUTBOX_MAX_RETRY_AFTER = int(os.getenv('OUTBOX_MAX_RETRY_AFTER', 60))  # Seconds
+
 # Cities in Kazakhstan
 CITIES = [
     'Atyrau', 'Kulsary', 'Almaty', 'Astana', 'Aktau', 'Aktobe', 
@@ -33,3 +58,34 @@ AUTO_TYPES = ['Автомат', 'Механика']
 # Mini App URL (update in production)
 MINI_APP_URL = os.getenv('MINI_APP_URL', 'http://localhost:3000')
 
+# Threads for bot ORM work; 0 = Django's single thread-sensitive executor
+BOT_DB_THREADS = int(os.getenv('BOT_DB_THREADS', 8))
+
+# Analytics events are buffered and written in batches
+ANALYTICS_BUFFER_SIZE = int(os.getenv('ANALYTICS_BUFFER_SIZE', 100))
+ANALYTICS_FLUSH_INTERVAL = float(os.getenv('ANALYTICS_FLUSH_INTERVAL', 2))  # Seconds
+
+# Schools/instructors shown per picker page
+PICKER_PAGE_SIZE = int(os.getenv('PICKER_PAGE_SIZE', 5))
+
+# Incoming update throttling per user
+THROTTLE_RATE = float(os.getenv('THROTTLE_RATE', 2))  # Updates per second
+THROTTLE_BURST = int(os.getenv('THROTTLE_BURST', 5))
+THROTTLE_DUPLICATE_WINDOW = float(os.getenv('THROTTLE_DUPLICATE_WINDOW', 1))  # Seconds
+
+# Logging
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'text')  # text or json
+LOG_FILE = os.getenv('LOG_FILE', '')
+LOG_SAMPLE_RATE = float(os.getenv('LOG_SAMPLE_RATE', 1))  # Multiplies per-event sample rates
+
+# Prometheus metrics endpoint (0 disables it)
+METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+METRICS_PORT = int(os.getenv('METRICS_PORT', 9100))
+
+# Seconds to wait for in-flight updates and queued messages on SIGTERM
+BOT_SHUTDOWN_TIMEOUT = float(os.getenv('BOT_SHUTDOWN_TIMEOUT', 20))
+
+# Sharded runner (python -m bot.cluster): worker processes and their sockets
+BOT_SHARDS = int(os.getenv('BOT_SHARDS', os.cpu_count() or 1))
+BOT_SHARD_SOCKET_DIR = os.getenv('BOT_SHARD_SOCKET_DIR', '/tmp/avtomat-bot')
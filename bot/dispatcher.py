@@ -0,0 +1,86 @@
+"""
+Dispatcher factory shared by all bot entry points.
+"""
+from typing import Optional
+from aiogram import Dispatcher
+from aiogram.fsm.storage.base import BaseStorage
+from bot.config import METRICS_HOST, METRICS_PORT
+from bot.middlewares.correlation import CorrelationIdMiddleware
+from bot.middlewares.in_flight import InFlightMiddleware
+from bot.middlewares.metrics import UpdateMetricsMiddleware, HandlerMetricsMiddleware
+from bot.middlewares.throttling import ThrottlingMiddleware
+from bot.services.fsm_storage import create_storage
+from bot.services.lifecycle import graceful_shutdown, replay_undelivered
+from bot.services.metrics import registry, install_db_timer, start_metrics_server
+from bot.services.pickers import warm_up
+from bot.handlers import start, schools, instructors, certificate
+
+
+def create_dispatcher(storage: Optional[BaseStorage] = None, metrics_port: int = METRICS_PORT) -> Dispatcher:
+    """Create dispatcher with persistent FSM storage and all routers."""
+    if storage is None:
+        storage = create_storage()
+    
+    # Storages that support it serialize updates per user and batch FSM writes
+    events_isolation = None
+    if hasattr(storage, 'create_isolation'):
+        events_isolation = storage.create_isolation()
+    
+    dp = Dispatcher(storage=storage, events_isolation=events_isolation)
+    
+    # Throttle before the FSM lock so duplicate taps don't queue behind the first one
+    dp['throttling'] = ThrottlingMiddleware()
+    dp['in_flight'] = InFlightMiddleware()
+    dp.update.outer_middleware.unregister(dp.fsm)
+    dp.update.outer_middleware(dp['in_flight'])
+    dp.update.outer_middleware(CorrelationIdMiddleware())
+    dp.update.outer_middleware(UpdateMetricsMiddleware())
+    dp.update.outer_middleware(dp['throttling'])
+    dp.update.outer_middleware(dp.fsm)
+    
+    # Per-handler metrics; inner middlewares apply to handlers of all included routers
+    handler_metrics = HandlerMetricsMiddleware()
+    dp.message.middleware(handler_metrics)
+    dp.callback_query.middleware(handler_metrics)
+    install_db_timer()
+    registry.callback(
+        'bot_throttled_updates_total', 'Updates by throttling decision.', ('decision',), 'counter',
+        lambda: {(decision,): count for decision, count in dp['throttling'].counters.items()}
+    )
+    
+    # Register routers
+    dp.include_router(start.router)
+    dp.include_router(schools.router)
+    dp.include_router(instructors.router)
+    dp.include_router(certificate.router)
+    
+    # Build shared keyboards before the first update arrives
+    dp.startup.register(warm_up)
+    
+    # Prometheus endpoint next to the polling or webhook loop
+    if metrics_port:
+        async def start_metrics():
+            dp['metrics_runner'] = await start_metrics_server(METRICS_HOST, metrics_port)
+        
+        async def stop_metrics():
+            runner = dp.workflow_data.pop('metrics_runner', None)
+            if runner is not None:
+                await runner.cleanup()
+        
+        dp.startup.register(start_metrics)
+        dp.shutdown.register(stop_metrics)
+    
+    # Resend messages left undelivered by the previous process
+    async def on_startup(bot):
+        await replay_undelivered(bot)
+    
+    # Finish in-flight updates, flush analytics and drain the outbox before exiting;
+    # polling entry points pass polling=True to start_polling()
+    async def on_shutdown(bot, polling: bool = False):
+        await graceful_shutdown(bot, dp['in_flight'], polling=polling)
+    
+    dp.startup.register(on_startup)
+    dp.shutdown.register(on_shutdown)
+    
+    return dp
+
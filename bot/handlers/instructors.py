@@ -5,12 +5,10 @@ from aiogram import Router, F
 from aiogram.types import Message, CallbackQuery
 from aiogram.fsm.context import FSMContext
 from bot.states import InstructorFlow
-from bot.keyboards.inline import (
-    get_cities_keyboard, get_auto_types_keyboard,
-    get_instructors_keyboard
-)
+from bot.keyboards.inline import get_cities_keyboard, get_auto_types_keyboard
 from bot.keyboards.reply import get_phone_keyboard
-from bot.services.instructor_service import get_instructors_by_city_and_type
+from bot.config import AUTO_TYPES
+from bot.services.pickers import get_instructors_page, parse_page_callback
 from bot.services.application_service import create_instructor_application
 from bot.services.analytics_service import track_event
 from bot.services.messaging import send_auto_response_to_user
@@ -53,10 +51,11 @@ async def process_auto_type_selection(callback: CallbackQuery, state: FSMContext
     
     await state.update_data(auto_type=auto_type)
     
-    # Get instructors for the city and auto type
-    instructors = await get_instructors_by_city_and_type(city, auto_type)
+    # Get first page of instructors for the city and auto type
+    page = await get_instructors_page(city, auto_type)
     
-    if not instructors:
+    if not page:
+        auto_type_text = AUTO_TYPES[0] if auto_type == 'automatic' else AUTO_TYPES[1]
         await callback.message.edit_text(
             f"😔 В городе {city} пока нет доступных инструкторов для {auto_type_text}.\n"
             "Попробуйте выбрать другой город или тип автомобиля."
@@ -64,6 +63,8 @@ async def process_auto_type_selection(callback: CallbackQuery, state: FSMContext
         await callback.answer()
         return
     
+    await state.set_state(InstructorFlow.waiting_instructor_selection)
+    
     # Track event
     await track_event(
         user_id=callback.from_user.id,
@@ -72,19 +73,20 @@ async def process_auto_type_selection(callback: CallbackQuery, state: FSMContext
         event_data={'city': city, 'auto_type': auto_type}
     )
     
-    instructors_text = "👨‍🏫 Доступные инструкторы:\n\n"
-    for instructor in instructors[:5]:  # Show first 5
-        instructors_text += (
-            f"• {instructor.name}\n"
-            f"  🚗 {instructor.get_auto_type_display()}\n"
-            f"  ⭐ Рейтинг: {instructor.rating}\n"
-            f"  📞 {instructor.phone}\n\n"
-        )
-    
-    await callback.message.edit_text(
-        instructors_text + "Выберите инструктора:",
-        reply_markup=get_instructors_keyboard(instructors)
-    )
+    instructors_text, keyboard = page
+    await callback.message.edit_text(instructors_text, reply_markup=keyboard)
+    await callback.answer()
+
+
+@router.callback_query(F.data.startswith("instructors_page:"), InstructorFlow.waiting_instructor_selection)
+async def process_instructors_page(callback: CallbackQuery, state: FSMContext):
+    """Show previous or next page of instructors."""
+    cursor, backwards = parse_page_callback(callback.data)
+    data = await state.get_data()
+    page = await get_instructors_page(data.get('city'), data.get('auto_type'), cursor, backwards)
+    if page:
+        instructors_text, keyboard = page
+        await callback.message.edit_text(instructors_text, reply_markup=keyboard)
     await callback.answer()
 
 
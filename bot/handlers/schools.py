@@ -7,32 +7,31 @@ from aiogram.fsm.context import FSMContext
 from bot.states import SchoolFlow
 from bot.keyboards.inline import (
     get_cities_keyboard, get_categories_keyboard, 
-    get_formats_keyboard, get_schools_keyboard
+    get_formats_keyboard
 )
 from bot.keyboards.reply import get_phone_keyboard
-from bot.services.school_service import get_schools_by_city
+from bot.services.pickers import get_schools_page, parse_page_callback
 from bot.services.application_service import create_school_application
 from bot.services.analytics_service import track_event
 from bot.services.messaging import send_auto_response_to_user
+import logging
 import re
 
+logger = logging.getLogger(__name__)
+
 router = Router()
 
 
 @router.callback_query(F.data.startswith("city_"), SchoolFlow.waiting_city)
 async def process_city_selection(callback: CallbackQuery, state: FSMContext):
     """Process city selection for school flow."""
-    import logging
-    logger = logging.getLogger(__name__)
-    
     city_name = callback.data.replace("city_", "")
-    logger.info(f"Saving city: {city_name} for user {callback.from_user.id}")
+    logger.info("Saving city %s for user %s", city_name, callback.from_user.id, extra={'sample': 0.1})
     
     await state.update_data(city=city_name)
     
-    # Verify data was saved
-    data = await state.get_data()
-    logger.info(f"Data after city save: {data}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Data after city save: %s", await state.get_data())
     
     await state.set_state(SchoolFlow.waiting_category)
     
@@ -46,29 +45,14 @@ async def process_city_selection(callback: CallbackQuery, state: FSMContext):
 @router.callback_query(F.data.startswith("category_"), SchoolFlow.waiting_category)
 async def process_category_selection(callback: CallbackQuery, state: FSMContext):
     """Process category selection."""
-    import logging
-    logger = logging.getLogger(__name__)
-    
     category = callback.data.replace("category_", "")
-    logger.info(f"Saving category: {category} for user {callback.from_user.id}")
-    
-    # Get current data first
-    current_data = await state.get_data()
-    logger.info(f"Current data before category save: {current_data}")
+    logger.info("Saving category %s for user %s", category, callback.from_user.id, extra={'sample': 0.1})
     
     await state.update_data(category=category)
-    
-    # Verify data was saved
-    data_after = await state.get_data()
-    logger.info(f"Data after category save: {data_after}")
-    
-    # Explicitly set state
     await state.set_state(SchoolFlow.waiting_format)
-    logger.info(f"State set to waiting_format after category selection: {category}")
     
-    # Verify state was set
-    verify_state = await state.get_state()
-    logger.info(f"Verified state after setting: {verify_state}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("State after category save: %s %s", await state.get_state(), await state.get_data())
     
     await callback.message.edit_text(
         "📚 Выберите формат обучения:",
@@ -80,9 +64,6 @@ async def process_category_selection(callback: CallbackQuery, state: FSMContext)
 @router.callback_query(F.data.startswith("format_"))
 async def process_format_selection(callback: CallbackQuery, state: FSMContext):
     """Process format selection and show schools - NO STATE FILTER to catch all format callbacks."""
-    import logging
-    logger = logging.getLogger(__name__)
-    
     try:
         # Extract format from callback (now uses English keys: online, offline, hybrid)
         format_key = callback.data.replace("format_", "")
@@ -98,43 +79,37 @@ async def process_format_selection(callback: CallbackQuery, state: FSMContext):
         }
         format_type = format_map.get(format_key, 'Оффлайн')  # Default to offline if not found
         
-        # Get state first
-        current_state = await state.get_state()
-        logger.info(f"Current state before format processing: {current_state}")
-        
         data = await state.get_data()
         city = data.get('city')
         category = data.get('category')
         
-        logger.info(f"Format selection: callback_data={callback.data}, format_key={format_key}, format_type={format_type}")
-        logger.info(f"State data: city={city}, category={category}")
-        logger.info(f"Full state data: {data}")
-        logger.info(f"User ID: {callback.from_user.id}")
+        logger.info(
+            "Format selection %s for user %s: city=%s, category=%s",
+            format_type, callback.from_user.id, city, category, extra={'sample': 0.1}
+        )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("State before format processing: %s %s", await state.get_state(), data)
         
         # Check if we have required data instead of strict state check
         if not city or not category:
-            logger.warning(f"Missing data: city={city}, category={category}")
-            # Try to get data from callback if possible (fallback)
-            # But this shouldn't happen - data should be in state
-            logger.error(f"CRITICAL: State data lost! User {callback.from_user.id} has no city/category")
-            await callback.answer(
+            # This shouldn't happen - data should be in state
+            logger.error("State data lost! User %s has no city/category (city=%s, category=%s)",
+                         callback.from_user.id, city, category)
+            await callback.message.answer(
                 "⚠️ Данные не сохранены. Пожалуйста, начните заново: /start\n\n"
-                "Это может произойти, если вы нажали на старую кнопку.",
-                show_alert=True
+                "Это может произойти, если вы нажали на старую кнопку."
             )
+            await callback.answer()
             await state.clear()
             return
         
         await state.update_data(format=format_type)
-        logger.info(f"Format saved: {format_type}")
         
-        # Get schools for the city
-        logger.info(f"Fetching schools for city: {city}")
-        schools = await get_schools_by_city(city)
-        logger.info(f"Found {len(schools)} schools")
+        # Get first page of schools for the city
+        page = await get_schools_page(city)
         
-        if not schools:
-            logger.warning(f"No schools found for city: {city}")
+        if not page:
+            logger.warning("No schools found for city %s", city)
             await callback.message.edit_text(
                 f"😔 В городе {city} пока нет доступных автошкол.\n"
                 "Попробуйте выбрать другой город."
@@ -144,7 +119,6 @@ async def process_format_selection(callback: CallbackQuery, state: FSMContext):
         
         # Set state to waiting for school selection
         await state.set_state(SchoolFlow.waiting_school_selection)
-        logger.info("State set to waiting_school_selection")
         
         # Track event (with error handling)
         try:
@@ -155,49 +129,38 @@ async def process_format_selection(callback: CallbackQuery, state: FSMContext):
                 event_data={'city': city, 'category': category, 'format': format_type}
             )
         except Exception as e:
-            logger.warning(f"Failed to track event: {e}")
-        
-        schools_text = "🏫 Доступные автошколы:\n\n"
-        for school in schools[:5]:  # Show first 5
-            schools_text += (
-                f"• {school.name}\n"
-                f"  ⭐ Рейтинг: {school.rating}\n"
-                f"  📍 {school.address}\n"
-                f"  💰 Цена: уточняйте\n\n"
-            )
-        
-        logger.info(f"Prepared schools text, length: {len(schools_text)}")
-        logger.info(f"Creating keyboard for {len(schools)} schools")
+            logger.warning("Failed to track event: %s", e)
         
+        schools_text, keyboard = page
         try:
-            keyboard = get_schools_keyboard(schools)
-            logger.info("Keyboard created successfully")
-            
-            await callback.message.edit_text(
-                schools_text + "Выберите автошколу:",
-                reply_markup=keyboard
-            )
+            await callback.message.edit_text(schools_text, reply_markup=keyboard)
             await callback.answer()
-            logger.info(f"Successfully showed {len(schools)} schools for city {city}")
         except Exception as e:
             # If edit fails, send new message
-            logger.error(f"Error editing message: {e}", exc_info=True)
+            logger.error("Error editing message: %s", e, exc_info=True)
             try:
-                keyboard = get_schools_keyboard(schools)
-                await callback.message.answer(
-                    schools_text + "Выберите автошколу:",
-                    reply_markup=keyboard
-                )
+                await callback.message.answer(schools_text, reply_markup=keyboard)
                 await callback.answer()
-                logger.info("Sent new message instead of editing")
             except Exception as e2:
-                logger.error(f"Failed to send new message: {e2}", exc_info=True)
-                await callback.answer(f"Ошибка: {str(e)}", show_alert=True)
+                logger.error("Failed to send new message: %s", e2, exc_info=True)
+                await callback.message.answer(f"Ошибка: {str(e)}")
+                await callback.answer()
     except Exception as e:
-        logger.error(f"Error in process_format_selection: {e}", exc_info=True)
-        import traceback
-        logger.error(traceback.format_exc())
-        await callback.answer(f"Произошла ошибка: {str(e)}. Попробуйте еще раз.", show_alert=True)
+        logger.error("Error in process_format_selection: %s", e, exc_info=True)
+        await callback.message.answer(f"Произошла ошибка: {str(e)}. Попробуйте еще раз.")
+        await callback.answer()
+
+
+@router.callback_query(F.data.startswith("schools_page:"), SchoolFlow.waiting_school_selection)
+async def process_schools_page(callback: CallbackQuery, state: FSMContext):
+    """Show previous or next page of schools."""
+    cursor, backwards = parse_page_callback(callback.data)
+    data = await state.get_data()
+    page = await get_schools_page(data.get('city'), cursor, backwards)
+    if page:
+        schools_text, keyboard = page
+        await callback.message.edit_text(schools_text, reply_markup=keyboard)
+    await callback.answer()
 
 
 @router.callback_query(F.data.startswith("school_"), SchoolFlow.waiting_school_selection)
@@ -2,10 +2,11 @@
 Start command and main menu handlers.
 """
 from aiogram import Router, F
-from aiogram.types import Message, CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup, WebAppInfo
+from aiogram.types import Message, CallbackQuery
 from aiogram.filters import Command, CommandStart
 from aiogram.fsm.context import FSMContext
-from bot.keyboards.inline import get_start_keyboard, get_certificate_options_keyboard
+from bot.keyboards.inline import get_web_app_keyboard, get_start_keyboard, get_certificate_options_keyboard
+from bot.services.pickers import get_cities_picker
 from bot.states import SchoolFlow, InstructorFlow, CertificateFlow
 
 router = Router()
@@ -16,22 +17,11 @@ router = Router()
 async def cmd_start(message: Message, state: FSMContext):
     """Start command handler."""
     await state.clear()
-    from bot.config import MINI_APP_URL
-    from aiogram.types import WebAppInfo
-    
-    # Create Web App button
-    web_app_button = InlineKeyboardButton(
-        text="🚀 Открыть приложение",
-        web_app=WebAppInfo(url=MINI_APP_URL)
-    )
-    
-    keyboard = InlineKeyboardMarkup(inline_keyboard=[[web_app_button]])
-    
     welcome_text = (
         "👋 Добро пожаловать в AvtoMat!\n\n"
         "Нажмите кнопку ниже, чтобы открыть приложение:"
     )
-    await message.answer(welcome_text, reply_markup=keyboard)
+    await message.answer(welcome_text, reply_markup=get_web_app_keyboard())
 
 
 @router.callback_query(F.data == "back_to_start")
@@ -49,11 +39,10 @@ async def back_to_start(callback: CallbackQuery, state: FSMContext):
 @router.callback_query(F.data == "flow_school")
 async def start_school_flow(callback: CallbackQuery, state: FSMContext):
     """Start school application flow."""
-    from bot.keyboards.inline import get_cities_keyboard
     await state.set_state(SchoolFlow.waiting_city)
     await callback.message.edit_text(
         "🏙 Выберите город:",
-        reply_markup=get_cities_keyboard()
+        reply_markup=await get_cities_picker()
     )
     await callback.answer()
 
@@ -61,11 +50,10 @@ async def start_school_flow(callback: CallbackQuery, state: FSMContext):
 @router.callback_query(F.data == "flow_instructor")
 async def start_instructor_flow(callback: CallbackQuery, state: FSMContext):
     """Start instructor application flow."""
-    from bot.keyboards.inline import get_cities_keyboard
     await state.set_state(InstructorFlow.waiting_city)
     await callback.message.edit_text(
         "🏙 Выберите город:",
-        reply_markup=get_cities_keyboard()
+        reply_markup=await get_cities_picker()
     )
     await callback.answer()
 
@@ -84,11 +72,10 @@ async def start_certificate_flow(callback: CallbackQuery, state: FSMContext):
 @router.callback_query(F.data == "cert_practice")
 async def cert_practice(callback: CallbackQuery, state: FSMContext):
     """Certificate: practice only -> instructor flow."""
-    from bot.keyboards.inline import get_cities_keyboard
     await state.set_state(InstructorFlow.waiting_city)
     await callback.message.edit_text(
         "🏙 Выберите город:",
-        reply_markup=get_cities_keyboard()
+        reply_markup=await get_cities_picker()
     )
     await callback.answer()
 
@@ -96,11 +83,10 @@ async def cert_practice(callback: CallbackQuery, state: FSMContext):
 @router.callback_query(F.data == "cert_full")
 async def cert_full(callback: CallbackQuery, state: FSMContext):
     """Certificate: full course -> school flow."""
-    from bot.keyboards.inline import get_cities_keyboard
     await state.set_state(SchoolFlow.waiting_city)
     await callback.message.edit_text(
         "🏙 Выберите город:",
-        reply_markup=get_cities_keyboard()
+        reply_markup=await get_cities_picker()
     )
     await callback.answer()
 
@@ -1,13 +1,35 @@
 """
 Inline keyboards for bot.
+
+Keyboards that do not depend on the user are built once and shared. Their
+attributes cannot be reassigned, but the rows are still plain lists: callers
+must not modify them (build a new keyboard instead).
 """
-from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
-from bot.config import CITIES, CATEGORIES, FORMATS, AUTO_TYPES
+from functools import lru_cache
+from typing import Tuple
+from pydantic import ConfigDict
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, WebAppInfo
+from bot.config import CITIES, CATEGORIES, FORMATS, AUTO_TYPES, MINI_APP_URL
+
+
+class FrozenInlineKeyboardMarkup(InlineKeyboardMarkup):
+    """Shared keyboard; reassigning attributes raises, the rows are still mutable lists."""
+    # InlineKeyboardMarkup is a MutableTelegramObject (frozen=False) in aiogram 3
+    model_config = ConfigDict(frozen=True)
 
 
+@lru_cache(maxsize=None)
+def get_web_app_keyboard():
+    """Button opening the Mini App."""
+    return FrozenInlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="🚀 Открыть приложение", web_app=WebAppInfo(url=MINI_APP_URL))]
+    ])
+
+
+@lru_cache(maxsize=None)
 def get_start_keyboard():
     """Start menu keyboard."""
-    keyboard = InlineKeyboardMarkup(inline_keyboard=[
+    keyboard = FrozenInlineKeyboardMarkup(inline_keyboard=[
         [
             InlineKeyboardButton(
                 text="❗ Нет водительских прав — хочу стать водителем",
@@ -30,19 +52,21 @@ def get_start_keyboard():
     return keyboard
 
 
-def get_cities_keyboard():
-    """Cities selection keyboard."""
+@lru_cache(maxsize=8)
+def get_cities_keyboard(cities: Tuple[str, ...] = tuple(CITIES)):
+    """Cities selection keyboard (cached per city list)."""
     buttons = []
-    for i in range(0, len(CITIES), 2):
+    for i in range(0, len(cities), 2):
         row = []
-        if i < len(CITIES):
-            row.append(InlineKeyboardButton(text=CITIES[i], callback_data=f"city_{CITIES[i]}"))
-        if i + 1 < len(CITIES):
-            row.append(InlineKeyboardButton(text=CITIES[i+1], callback_data=f"city_{CITIES[i+1]}"))
+        if i < len(cities):
+            row.append(InlineKeyboardButton(text=cities[i], callback_data=f"city_{cities[i]}"))
+        if i + 1 < len(cities):
+            row.append(InlineKeyboardButton(text=cities[i+1], callback_data=f"city_{cities[i+1]}"))
         buttons.append(row)
-    return InlineKeyboardMarkup(inline_keyboard=buttons)
+    return FrozenInlineKeyboardMarkup(inline_keyboard=buttons)
 
 
+@lru_cache(maxsize=None)
 def get_categories_keyboard():
     """License categories keyboard."""
     buttons = []
@@ -55,18 +79,14 @@ def get_categories_keyboard():
                     callback_data=f"category_{CATEGORIES[i+j]}"
                 ))
         buttons.append(row)
-    return InlineKeyboardMarkup(inline_keyboard=buttons)
+    return FrozenInlineKeyboardMarkup(inline_keyboard=buttons)
 
 
+@lru_cache(maxsize=None)
 def get_formats_keyboard():
     """Training formats keyboard."""
     # Use English keys for callback_data to avoid encoding issues
-    format_map = {
-        'online': FORMATS[0],  # 'Онлайн'
-        'offline': FORMATS[1],  # 'Оффлайн'
-        'hybrid': FORMATS[2]   # 'Гибрид'
-    }
-    keyboard = InlineKeyboardMarkup(inline_keyboard=[
+    keyboard = FrozenInlineKeyboardMarkup(inline_keyboard=[
         [InlineKeyboardButton(text=FORMATS[0], callback_data="format_online")],
         [InlineKeyboardButton(text=FORMATS[1], callback_data="format_offline")],
         [InlineKeyboardButton(text=FORMATS[2], callback_data="format_hybrid")]
@@ -74,17 +94,28 @@ def get_formats_keyboard():
     return keyboard
 
 
+@lru_cache(maxsize=None)
 def get_auto_types_keyboard():
     """Auto types keyboard."""
     # Use English keys for callback_data to avoid encoding issues
-    keyboard = InlineKeyboardMarkup(inline_keyboard=[
+    keyboard = FrozenInlineKeyboardMarkup(inline_keyboard=[
         [InlineKeyboardButton(text=AUTO_TYPES[0], callback_data="auto_automatic")],  # 'Автомат'
         [InlineKeyboardButton(text=AUTO_TYPES[1], callback_data="auto_manual")]      # 'Механика'
     ])
     return keyboard
 
 
-def get_schools_keyboard(schools):
+def get_page_navigation_row(prefix, prev_cursor=None, next_cursor=None):
+    """Prev/next buttons for a paginated picker (empty row on a single page)."""
+    row = []
+    if prev_cursor:
+        row.append(InlineKeyboardButton(text="⬅️ Предыдущие", callback_data=f"{prefix}:prev:{prev_cursor}"))
+    if next_cursor:
+        row.append(InlineKeyboardButton(text="Следующие ➡️", callback_data=f"{prefix}:next:{next_cursor}"))
+    return row
+
+
+def get_schools_keyboard(schools, prev_cursor=None, next_cursor=None):
     """Schools list keyboard."""
     buttons = []
     for school in schools:
@@ -94,11 +125,14 @@ def get_schools_keyboard(schools):
                 callback_data=f"school_{school.id}"
             )
         ])
+    navigation = get_page_navigation_row("schools_page", prev_cursor, next_cursor)
+    if navigation:
+        buttons.append(navigation)
     buttons.append([InlineKeyboardButton(text="🔙 Назад", callback_data="back_to_start")])
-    return InlineKeyboardMarkup(inline_keyboard=buttons)
+    return FrozenInlineKeyboardMarkup(inline_keyboard=buttons)
 
 
-def get_instructors_keyboard(instructors):
+def get_instructors_keyboard(instructors, prev_cursor=None, next_cursor=None):
     """Instructors list keyboard."""
     buttons = []
     for instructor in instructors:
@@ -108,13 +142,17 @@ def get_instructors_keyboard(instructors):
                 callback_data=f"instructor_{instructor.id}"
             )
         ])
+    navigation = get_page_navigation_row("instructors_page", prev_cursor, next_cursor)
+    if navigation:
+        buttons.append(navigation)
     buttons.append([InlineKeyboardButton(text="🔙 Назад", callback_data="back_to_start")])
-    return InlineKeyboardMarkup(inline_keyboard=buttons)
+    return FrozenInlineKeyboardMarkup(inline_keyboard=buttons)
 
 
+@lru_cache(maxsize=None)
 def get_certificate_options_keyboard():
     """Certificate flow options keyboard."""
-    keyboard = InlineKeyboardMarkup(inline_keyboard=[
+    keyboard = FrozenInlineKeyboardMarkup(inline_keyboard=[
         [
             InlineKeyboardButton(
                 text="Только практика",
@@ -137,12 +175,21 @@ def get_certificate_options_keyboard():
     return keyboard
 
 
+@lru_cache(maxsize=1024)
 def get_whatsapp_keyboard(phone, text=""):
     """WhatsApp deep link button."""
     phone_clean = phone.replace('+', '').replace(' ', '').replace('-', '')
     url = f"https://wa.me/{phone_clean}?text={text}"
-    keyboard = InlineKeyboardMarkup(inline_keyboard=[
+    keyboard = FrozenInlineKeyboardMarkup(inline_keyboard=[
         [InlineKeyboardButton(text="💬 Написать в WhatsApp", url=url)]
     ])
     return keyboard
 
+
+def build_static_keyboards():
+    """Build shared keyboards ahead of the first update."""
+    for build in (
+        get_web_app_keyboard, get_start_keyboard, get_cities_keyboard, get_categories_keyboard,
+        get_formats_keyboard, get_auto_types_keyboard, get_certificate_options_keyboard
+    ):
+        build()
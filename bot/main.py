@@ -3,16 +3,13 @@ Main entry point for Telegram bot.
 """
 import asyncio
 import logging
-from aiogram import Bot, Dispatcher
-from aiogram.fsm.storage.memory import MemoryStorage
 from bot.config import TELEGRAM_BOT_TOKEN
-from bot.handlers import start, schools, instructors, certificate
+from bot.services.telegram_client import get_bot
+from bot.dispatcher import create_dispatcher
+from bot.utils.logs import setup_logging
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+setup_logging()
 logger = logging.getLogger(__name__)
 
 
@@ -23,19 +20,17 @@ async def main():
         return
     
     # Initialize bot and dispatcher
-    bot = Bot(token=TELEGRAM_BOT_TOKEN)
-    dp = Dispatcher(storage=MemoryStorage())
+    bot = get_bot()
+    dp = create_dispatcher()
     
-    # Register routers
-    dp.include_router(start.router)
-    dp.include_router(schools.router)
-    dp.include_router(instructors.router)
-    dp.include_router(certificate.router)
+    # Drop conversations abandoned longer than the TTL
+    if hasattr(dp.storage, 'purge_expired'):
+        await dp.storage.purge_expired()
     
     logger.info("Bot started!")
     
-    # Start polling
-    await dp.start_polling(bot)
+    # Start polling; SIGTERM stops it and runs the graceful shutdown hook
+    await dp.start_polling(bot, polling=True)
 
 
 if __name__ == '__main__':
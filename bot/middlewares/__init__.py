@@ -0,0 +1,3 @@
+"""
+Dispatcher and session middlewares.
+"""
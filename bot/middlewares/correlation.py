@@ -0,0 +1,23 @@
+"""
+Correlation id for log records.
+"""
+from typing import Any, Awaitable, Callable, Dict
+from aiogram import BaseMiddleware
+from aiogram.types import Update
+from bot.utils.logs import update_id_var
+
+
+class CorrelationIdMiddleware(BaseMiddleware):
+    """Outer update middleware tagging log records with the update id."""
+
+    async def __call__(
+        self,
+        handler: Callable[[Update, Dict[str, Any]], Awaitable[Any]],
+        event: Update,
+        data: Dict[str, Any]
+    ) -> Any:
+        token = update_id_var.set(event.update_id)
+        try:
+            return await handler(event, data)
+        finally:
+            update_id_var.reset(token)
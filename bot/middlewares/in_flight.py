@@ -0,0 +1,44 @@
+"""
+Tracking of updates currently being handled, for graceful shutdown.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional
+from aiogram import BaseMiddleware
+from aiogram.types import Update
+
+
+class InFlightMiddleware(BaseMiddleware):
+    """Outer update middleware counting updates in progress."""
+
+    def __init__(self):
+        self.count = 0
+        self.last_update_id: Optional[int] = None
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    async def __call__(
+        self,
+        handler: Callable[[Update, Dict[str, Any]], Awaitable[Any]],
+        event: Update,
+        data: Dict[str, Any]
+    ) -> Any:
+        self.count += 1
+        self._idle.clear()
+        if self.last_update_id is None or event.update_id > self.last_update_id:
+            self.last_update_id = event.update_id
+        try:
+            return await handler(event, data)
+        finally:
+            self.count -= 1
+            if not self.count:
+                self._idle.set()
+
+    async def wait_idle(self, timeout: float) -> bool:
+        """Wait until no update is being handled; False if `timeout` ran out first."""
+        # Let tasks for updates already fetched enter the middleware
+        await asyncio.sleep(0)
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
@@ -0,0 +1,68 @@
+"""
+Update and handler metrics (see bot.services.metrics).
+"""
+from time import perf_counter
+from typing import Any, Awaitable, Callable, Dict, Tuple
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, Update
+from bot.services.metrics import (
+    DbStats, current_db_stats,
+    HANDLER_DURATION, HANDLER_ERRORS, HANDLER_IN_FLIGHT,
+    UPDATE_DURATION, UPDATE_DB_DURATION, UPDATE_DB_QUERIES
+)
+
+
+class UpdateMetricsMiddleware(BaseMiddleware):
+    """Outer update middleware: total latency and database time per update."""
+
+    async def __call__(
+        self,
+        handler: Callable[[Update, Dict[str, Any]], Awaitable[Any]],
+        event: Update,
+        data: Dict[str, Any]
+    ) -> Any:
+        stats = DbStats()
+        token = current_db_stats.set(stats)
+        started = perf_counter()
+        try:
+            return await handler(event, data)
+        finally:
+            current_db_stats.reset(token)
+            update_type = event.event_type
+            UPDATE_DURATION.observe(perf_counter() - started, update_type)
+            UPDATE_DB_DURATION.observe(stats.seconds, update_type)
+            if stats.queries:
+                UPDATE_DB_QUERIES.inc(update_type, amount=stats.queries)
+
+
+class HandlerMetricsMiddleware(BaseMiddleware):
+    """Inner middleware: latency, errors and in-flight calls per router and handler."""
+
+    def __init__(self):
+        self._labels: Dict[Callable, Tuple[str, str]] = {}
+
+    def _handler_labels(self, callback: Callable) -> Tuple[str, str]:
+        labels = self._labels.get(callback)
+        if labels is None:
+            # bot.handlers.schools.process_city_selection -> ('schools', 'process_city_selection')
+            router = getattr(callback, '__module__', '').rsplit('.', 1)[-1]
+            labels = self._labels[callback] = (router, getattr(callback, '__name__', repr(callback)))
+        return labels
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        labels = self._handler_labels(data['handler'].callback)
+        HANDLER_IN_FLIGHT.inc(*labels)
+        started = perf_counter()
+        try:
+            return await handler(event, data)
+        except Exception:
+            HANDLER_ERRORS.inc(*labels)
+            raise
+        finally:
+            HANDLER_DURATION.observe(perf_counter() - started, *labels)
+            HANDLER_IN_FLIGHT.dec(*labels)
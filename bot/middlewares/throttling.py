@@ -0,0 +1,152 @@
+"""
+Per-user throttling of incoming updates.
+
+Repeated taps on the same inline button are collapsed, and every user gets
+a token bucket. Callback queries that pass are answered right away so the
+button spinner clears; the handler's own answer is then dropped by
+PreAnsweredMiddleware on the bot session, so handlers send error texts as
+messages rather than alerts.
+"""
+import asyncio
+import logging
+from collections import OrderedDict
+from time import monotonic
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+from aiogram import BaseMiddleware
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.methods import AnswerCallbackQuery
+from aiogram.types import CallbackQuery, Update
+from bot.config import THROTTLE_RATE, THROTTLE_BURST, THROTTLE_DUPLICATE_WINDOW
+from bot.services.rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# Per-user state is pruned once more users than this are tracked
+MAX_TRACKED_USERS = 10000
+# Callback queries remembered as answered early
+MAX_ANSWERED_CALLBACKS = 10000
+
+
+class AnsweredCallbacks:
+    """Callback queries answered before their handler ran."""
+
+    def __init__(self, max_size: int = MAX_ANSWERED_CALLBACKS):
+        self.max_size = max_size
+        self._answers: "OrderedDict[str, AnswerCallbackQuery]" = OrderedDict()
+
+    def add(self, query_id: str, method: AnswerCallbackQuery):
+        self._answers[query_id] = method
+        if len(self._answers) > self.max_size:
+            self._answers.popitem(last=False)
+
+    def get(self, query_id: str) -> Optional[AnswerCallbackQuery]:
+        return self._answers.get(query_id)
+
+    def discard(self, query_id: str):
+        self._answers.pop(query_id, None)
+
+
+answered_callbacks = AnsweredCallbacks()
+
+
+class PreAnsweredMiddleware(BaseRequestMiddleware):
+    """Session middleware that drops second answers to callbacks answered early."""
+
+    def __init__(self, answered: AnsweredCallbacks = answered_callbacks):
+        self.answered = answered
+
+    async def __call__(self, make_request, bot, method):
+        if isinstance(method, AnswerCallbackQuery):
+            early = self.answered.get(method.callback_query_id)
+            if early is not None and early is not method:
+                # A callback query can be answered once; Telegram would reject this one
+                self.answered.discard(method.callback_query_id)
+                if method.text:
+                    logger.warning("Dropped late callback answer text: %s", method.text)
+                return True
+        return await make_request(bot, method)
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """Outer update middleware: collapse duplicate callbacks and rate limit each user."""
+
+    def __init__(
+        self,
+        rate: float = THROTTLE_RATE,
+        burst: int = THROTTLE_BURST,
+        duplicate_window: float = THROTTLE_DUPLICATE_WINDOW,
+        answered: AnsweredCallbacks = answered_callbacks
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.duplicate_window = duplicate_window
+        self.answered = answered
+        self.buckets: Dict[int, TokenBucket] = {}
+        self.last_callbacks: Dict[int, Tuple[str, float]] = {}
+        self.counters = {'passed': 0, 'dropped': 0, 'collapsed': 0}
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def __call__(
+        self,
+        handler: Callable[[Update, Dict[str, Any]], Awaitable[Any]],
+        event: Update,
+        data: Dict[str, Any]
+    ) -> Any:
+        user = data.get('event_from_user')
+        if user is None:
+            return await handler(event, data)
+        callback = event.callback_query
+
+        if callback is not None and self._is_duplicate(user.id, callback.data):
+            self.counters['collapsed'] += 1
+            self._spawn(callback.answer())
+            return None
+
+        if not self._bucket(user.id).try_acquire():
+            self.counters['dropped'] += 1
+            logger.debug("Dropped update %s from user %s", event.update_id, user.id)
+            if callback is not None:
+                self._spawn(callback.answer())
+            return None
+
+        self.counters['passed'] += 1
+        if callback is not None:
+            self._answer_early(callback)
+        return await handler(event, data)
+
+    def _is_duplicate(self, user_id: int, callback_data: Optional[str]) -> bool:
+        now = monotonic()
+        last = self.last_callbacks.get(user_id)
+        if last is not None and last[0] == callback_data and now - last[1] < self.duplicate_window:
+            return True
+        if len(self.last_callbacks) >= MAX_TRACKED_USERS:
+            self.last_callbacks = {
+                key: value for key, value in self.last_callbacks.items()
+                if now - value[1] < self.duplicate_window
+            }
+        self.last_callbacks[user_id] = (callback_data, now)
+        return False
+
+    def _bucket(self, user_id: int) -> TokenBucket:
+        bucket = self.buckets.get(user_id)
+        if bucket is None:
+            if len(self.buckets) >= MAX_TRACKED_USERS:
+                self.buckets = {key: value for key, value in self.buckets.items() if not value.is_full}
+            bucket = self.buckets[user_id] = TokenBucket(self.rate, self.burst)
+        return bucket
+
+    def _answer_early(self, callback: CallbackQuery):
+        method = callback.answer()
+        self.answered.add(callback.id, method)
+        self._spawn(method)
+
+    def _spawn(self, coro: Awaitable) -> asyncio.Task:
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._done)
+        return task
+
+    def _done(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Failed to answer callback query: %s", task.exception())
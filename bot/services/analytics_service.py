@@ -1,32 +1,184 @@
 """
 Analytics service for tracking user behavior.
+
+Events are buffered in memory and written in batches (bulk_create) on a size
+or time threshold, so handlers never wait on analytics queries.
 """
+import asyncio
+import logging
+from collections import defaultdict
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from bot.services.database import User
-from crm.analytics.models import AnalyticsEvent, DisciplineIndex
-from typing import Optional, Dict, Any
-from asgiref.sync import sync_to_async
-from bot.services.application_service import get_or_create_user
+from bot.config import ANALYTICS_BUFFER_SIZE, ANALYTICS_FLUSH_INTERVAL
+from bot.services.database import User, db_sync_to_async
+from crm.analytics.models import AnalyticsEvent
+from crm.analytics.services import apply_events_to_discipline_index, rebuild_discipline_index
+from django.db import transaction
+from django.db.models import Max
+from typing import Optional, Dict, Any, List, Set
+
+logger = logging.getLogger(__name__)
+
+# Keep at most this many buffers' worth of events when the database is unavailable
+MAX_PENDING_FACTOR = 10
+# Last-seen map is pruned of users idle longer than this once it grows large
+LAST_SEEN_LIMIT = 50000
+LAST_SEEN_MAX_AGE = 24 * 3600  # Seconds
+
+
+@dataclass
+class PendingEvent:
+    """Analytics event waiting to be written."""
+    telegram_id: int
+    event_type: str
+    step_name: str
+    event_data: Dict[str, Any]
+    timestamp: datetime
+    time_since_last: Optional[float]
+    lookup_last: bool = False  # time_since_last must come from stored history
+
+
+@db_sync_to_async
+def _write_events(events: List[PendingEvent]):
+    """Write buffered events and update discipline indices synchronously."""
+    users = {}
+    for telegram_id in {e.telegram_id for e in events}:
+        users[telegram_id], _ = User.objects.get_or_create(
+            telegram_id=telegram_id,
+            defaults={'username': f"user_{telegram_id}", 'role': 'student'}
+        )
+
+    # Users not seen since the bot started: take time since their last stored event
+    lookup_ids = {e.telegram_id for e in events if e.lookup_last}
+    if lookup_ids:
+        last_timestamps = dict(
+            AnalyticsEvent.objects.filter(user__telegram_id__in=lookup_ids)
+            .values('user__telegram_id')
+            .annotate(last=Max('timestamp'))
+            .values_list('user__telegram_id', 'last')
+        )
+        for event in events:
+            last = last_timestamps.get(event.telegram_id) if event.lookup_last else None
+            if last:
+                event.time_since_last = (event.timestamp - last).total_seconds()
+
+    events_by_user = defaultdict(list)
+    for e in events:
+        events_by_user[e.telegram_id].append((e.event_type, e.time_since_last))
+
+    # One transaction: if an index update fails, the events are not stored
+    # either, so the batch can be retried without counting events twice
+    with transaction.atomic():
+        AnalyticsEvent.objects.bulk_create([
+            AnalyticsEvent(
+                user=users[e.telegram_id],
+                event_type=e.event_type,
+                step_name=e.step_name,
+                event_data=e.event_data,
+                timestamp=e.timestamp,
+                time_since_last=e.time_since_last
+            )
+            for e in events
+        ])
+        # Same order in every batch, so concurrent flushes lock index rows without deadlocks
+        for telegram_id in sorted(events_by_user):
+            apply_events_to_discipline_index(users[telegram_id], events_by_user[telegram_id])
+
 
+class AnalyticsBuffer:
+    """In-process buffer of analytics events flushed in batches."""
 
-@sync_to_async
-def _get_last_event(user):
-    """Get last event synchronously."""
-    return AnalyticsEvent.objects.filter(
-        user=user
-    ).order_by('-timestamp').first()
+    def __init__(self, max_size: int = ANALYTICS_BUFFER_SIZE, flush_interval: float = ANALYTICS_FLUSH_INTERVAL):
+        self.max_size = max_size
+        self.flush_interval = flush_interval
+        self.events: List[PendingEvent] = []
+        self.last_seen: Dict[int, datetime] = {}
+        self._flush_lock = asyncio.Lock()
+        self._timer: Optional[asyncio.Task] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._closed = False
 
+    def add(
+        self,
+        telegram_id: int,
+        event_type: str,
+        step_name: str = "",
+        event_data: Optional[Dict[str, Any]] = None,
+        time_since_last: Optional[float] = None
+    ):
+        """Buffer an event; never touches the database."""
+        now = datetime.now(timezone.utc)
+        lookup_last = False
+        if time_since_last is None:
+            last = self.last_seen.get(telegram_id)
+            if last:
+                time_since_last = (now - last).total_seconds()
+            else:
+                lookup_last = True
+        self._remember(telegram_id, now)
 
-@sync_to_async
-def _create_analytics_event(user, event_type, step_name, event_data, time_since_last):
-    """Create analytics event synchronously."""
-    return AnalyticsEvent.objects.create(
-        user=user,
-        event_type=event_type,
-        step_name=step_name,
-        event_data=event_data or {},
-        time_since_last=time_since_last
-    )
+        self.events.append(PendingEvent(
+            telegram_id=telegram_id,
+            event_type=event_type,
+            step_name=step_name,
+            event_data=event_data or {},
+            timestamp=now,
+            time_since_last=time_since_last,
+            lookup_last=lookup_last
+        ))
+
+        if len(self.events) >= self.max_size:
+            self._spawn(self.flush())
+        elif self._timer is None:
+            self._timer = self._spawn(self._flush_later())
+
+    def _remember(self, telegram_id: int, now: datetime):
+        if len(self.last_seen) >= LAST_SEEN_LIMIT:
+            self.last_seen = {
+                key: value for key, value in self.last_seen.items()
+                if (now - value).total_seconds() < LAST_SEEN_MAX_AGE
+            }
+        self.last_seen[telegram_id] = now
+
+    def _spawn(self, coro) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _flush_later(self):
+        try:
+            await asyncio.sleep(self.flush_interval)
+        finally:
+            self._timer = None
+        await self.flush()
+
+    async def flush(self):
+        """Write all buffered events."""
+        async with self._flush_lock:
+            events, self.events = self.events, []
+            if not events:
+                return
+            try:
+                await _write_events(events)
+            except Exception as e:
+                logger.error("Failed to write %s analytics events: %s", len(events), e, exc_info=True)
+                # Keep events for the next flush unless the backlog is already too large
+                if len(self.events) + len(events) <= self.max_size * MAX_PENDING_FACTOR:
+                    self.events[:0] = events
+                # Retry after the interval even if no new events arrive
+                if self.events and self._timer is None and not self._closed:
+                    self._timer = self._spawn(self._flush_later())
+
+    async def close(self):
+        """Flush remaining events; called on shutdown."""
+        self._closed = True
+        if self._timer is not None:
+            self._timer.cancel()
+        await self.flush()
+
+
+analytics_buffer = AnalyticsBuffer()
 
 
 async def track_event(
@@ -36,72 +188,16 @@ async def track_event(
     event_data: Optional[Dict[str, Any]] = None,
     time_since_last: Optional[float] = None
 ):
-    """Track analytics event."""
-    user = await get_or_create_user(user_id)
-    
-    # Calculate time since last event if not provided
-    if time_since_last is None:
-        last_event = await _get_last_event(user)
-        
-        if last_event:
-            time_since_last = (datetime.now(timezone.utc) - last_event.timestamp).total_seconds()
-    
-    await _create_analytics_event(user, event_type, step_name, event_data, time_since_last)
-    
-    # Update discipline index
-    await update_discipline_index(user)
-
-
-@sync_to_async
-def _get_events(user):
-    """Get events synchronously."""
-    return list(AnalyticsEvent.objects.filter(user=user).order_by('timestamp'))
-
-
-@sync_to_async
-def _update_discipline_index_sync(user, average_step_time, return_count, reaction_delay, total_clicks, index):
-    """Update discipline index synchronously."""
-    discipline_index, created = DisciplineIndex.objects.get_or_create(user=user)
-    discipline_index.average_step_time = average_step_time
-    discipline_index.return_count = return_count
-    discipline_index.reaction_delay = reaction_delay
-    discipline_index.total_clicks = total_clicks
-    discipline_index.index_value = index
-    discipline_index.save()
-    return discipline_index
+    """Track analytics event (buffered, returns immediately)."""
+    analytics_buffer.add(user_id, event_type, step_name, event_data, time_since_last)
 
 
-async def update_discipline_index(user: User):
-    """Update user's discipline index."""
-    events = await _get_events(user)
-    
-    if not events:
-        return
-    
-    # Calculate metrics
-    step_times = [e.time_since_last for e in events if e.time_since_last]
-    average_step_time = sum(step_times) / len(step_times) if step_times else 0
-    
-    return_count = sum(1 for e in events if e.event_type == 'return')
-    
-    button_click_events = [e for e in events if e.event_type == 'button_click']
-    reaction_delays = [e.time_since_last for e in button_click_events if e.time_since_last]
-    reaction_delay = sum(reaction_delays) / len(reaction_delays) if reaction_delays else 0
-    
-    total_clicks = len(button_click_events)
-    
-    # Calculate index (simplified formula for MVP)
-    # Higher is better (100 = perfect)
-    index = 100.0
-    if average_step_time > 300:  # More than 5 minutes between steps
-        index -= 10
-    if return_count > 3:
-        index -= 5 * return_count
-    if reaction_delay > 60:  # More than 1 minute reaction
-        index -= 5
-    
-    index = max(0, min(100, index))
-    
-    # Update or create discipline index
-    await _update_discipline_index_sync(user, average_step_time, return_count, reaction_delay, total_clicks, index)
+@db_sync_to_async
+def _rebuild_discipline_index(user):
+    """Rebuild discipline index synchronously."""
+    return rebuild_discipline_index(user)
 
+
+async def update_discipline_index(user: User):
+    """Recalculate user's discipline index from the full event history."""
+    return await _rebuild_discipline_index(user)
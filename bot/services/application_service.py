@@ -2,12 +2,12 @@
 Service for creating and managing applications.
 """
 from datetime import datetime
-from bot.services.database import User, Application, School, Instructor, City
+from django.db import IntegrityError, transaction
+from bot.services.database import User, Application, School, Instructor, City, db_sync_to_async
 from typing import Optional
-from asgiref.sync import sync_to_async
 
 
-@sync_to_async
+@db_sync_to_async
 def _get_user(telegram_id: int):
     """Get user synchronously."""
     try:
@@ -16,21 +16,26 @@ def _get_user(telegram_id: int):
         return None
 
 
-@sync_to_async
+@db_sync_to_async
 def _create_user(telegram_id: int, username: str = None):
     """Create user synchronously."""
-    user = User.objects.create_user(
-        username=f"user_{telegram_id}",
-        telegram_id=telegram_id,
-        role='student'
-    )
+    try:
+        with transaction.atomic():
+            user = User.objects.create_user(
+                username=f"user_{telegram_id}",
+                telegram_id=telegram_id,
+                role='student'
+            )
+    except IntegrityError:
+        # Created meanwhile, e.g. by an analytics flush for the same user
+        return User.objects.get(telegram_id=telegram_id)
     if username:
         user.username = username
         user.save()
     return user
 
 
-@sync_to_async
+@db_sync_to_async
 def _update_user_username(user, username: str):
     """Update user username synchronously."""
     user.username = username
@@ -49,7 +54,7 @@ async def get_or_create_user(telegram_id: int, username: str = None) -> User:
     return user
 
 
-@sync_to_async
+@db_sync_to_async
 def _get_city_for_app(city_name: str):
     """Get city synchronously."""
     try:
@@ -58,7 +63,7 @@ def _get_city_for_app(city_name: str):
         return None
 
 
-@sync_to_async
+@db_sync_to_async
 def _get_school_for_app(school_id: int):
     """Get school synchronously."""
     try:
@@ -67,7 +72,7 @@ def _get_school_for_app(school_id: int):
         return None
 
 
-@sync_to_async
+@db_sync_to_async
 def _get_instructor_for_app(instructor_id: int):
     """Get instructor synchronously."""
     try:
@@ -76,7 +81,7 @@ def _get_instructor_for_app(instructor_id: int):
         return None
 
 
-@sync_to_async
+@db_sync_to_async
 def _create_school_application(user, school, city_obj, category, format_value, name, phone):
     """Create school application synchronously."""
     return Application.objects.create(
@@ -91,7 +96,7 @@ def _create_school_application(user, school, city_obj, category, format_value, n
     )
 
 
-@sync_to_async
+@db_sync_to_async
 def _create_instructor_application(user, instructor, city_obj, name, phone, time_slot):
     """Create instructor application synchronously."""
     return Application.objects.create(
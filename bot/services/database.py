@@ -2,12 +2,66 @@
 Database connection and Django ORM integration for bot.
 """
 import os
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
 import django
+from asgiref.sync import sync_to_async
 
 # Setup Django
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 django.setup()
 
 # Now we can import Django models
-from core.models import User, School, Instructor, Application, City
+from core.models import User, School, Instructor, Application, City, BotState, DeadLetter
+from django.db import close_old_connections
+from bot.config import BOT_DB_THREADS
 
+# Django 4.2's async QuerySet methods (aget, acreate, ...) still run on the
+# single thread-sensitive executor, which serializes DB work of all users.
+# Bot services run their ORM calls on this bounded pool instead. Each thread
+# keeps its own connection, so the pool also caps connections per bot process.
+_db_executor: Optional[ThreadPoolExecutor] = None
+_db_threads = BOT_DB_THREADS
+
+
+def configure_db_executor(threads: int):
+    """Set the number of ORM threads (0 = Django's thread-sensitive executor)."""
+    global _db_executor, _db_threads
+    if _db_executor is not None:
+        _db_executor.shutdown(wait=False)
+    _db_executor = None
+    _db_threads = threads
+
+
+def _get_db_executor() -> ThreadPoolExecutor:
+    global _db_executor
+    if _db_executor is None:
+        _db_executor = ThreadPoolExecutor(max_workers=_db_threads, thread_name_prefix='bot-db')
+    return _db_executor
+
+
+def _recycling_connections(func):
+    """Wrap func to drop its thread's connection first if obsolete or broken."""
+    @functools.wraps(func)
+    def inner(*args, **kwargs):
+        # What Django does at the start of every web request: closes connections
+        # older than CONN_MAX_AGE or left unusable by errors, and schedules a
+        # health check before the next query (CONN_HEALTH_CHECKS)
+        close_old_connections()
+        return func(*args, **kwargs)
+    return inner
+
+
+def db_sync_to_async(func):
+    """Like @sync_to_async, but runs on the bot's ORM thread pool."""
+    func = _recycling_connections(func)
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        if _db_threads <= 0:
+            return await sync_to_async(func)(*args, **kwargs)
+        return await sync_to_async(
+            func, thread_sensitive=False, executor=_get_db_executor()
+        )(*args, **kwargs)
+    return wrapper
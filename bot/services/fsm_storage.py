@@ -0,0 +1,212 @@
+"""
+Persistent FSM storage for the bot.
+
+State is kept in the Django database (or Redis) so several bot workers can
+share it and restarts lose nothing. Writes made while handling one update
+are collected and flushed with a single upsert when the update is done.
+"""
+import json
+from asyncio import Lock
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, AsyncGenerator, Dict, Optional
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseEventIsolation, BaseStorage, StateType, StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+from django.db import IntegrityError
+from django.utils import timezone
+from bot.config import FSM_STORAGE, FSM_STATE_TTL, REDIS_URL
+from bot.services.database import BotState, db_sync_to_async
+
+
+def dumps(data: Dict[str, Any]) -> str:
+    """Serialize FSM data to compact JSON."""
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'), default=_encode)
+
+
+def loads(raw: str) -> Dict[str, Any]:
+    """Deserialize FSM data produced by dumps()."""
+    if not raw:
+        return {}
+    return json.loads(raw, object_hook=_decode)
+
+
+def _encode(value):
+    """Encode values JSON does not support natively."""
+    if isinstance(value, datetime):
+        return {'$dt': value.isoformat()}
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _decode(obj):
+    """Decode values encoded by _encode()."""
+    if len(obj) == 1 and '$dt' in obj:
+        return datetime.fromisoformat(obj['$dt'])
+    return obj
+
+
+@dataclass
+class _Record:
+    state: Optional[str] = None
+    data: Dict[str, Any] = field(default_factory=dict)
+    dirty: bool = False
+
+
+# Records touched by the update currently being handled (None outside a batch)
+_pending: ContextVar[Optional[Dict[StorageKey, _Record]]] = ContextVar('fsm_pending', default=None)
+
+
+@db_sync_to_async
+def _read_record(key: str) -> _Record:
+    """Read FSM record synchronously."""
+    row = BotState.objects.filter(key=key, expires_at__gt=timezone.now()).first()
+    if not row:
+        return _Record()
+    return _Record(state=row.state, data=loads(row.data))
+
+
+@db_sync_to_async
+def _write_record(key: str, state: Optional[str], data: Dict[str, Any], ttl: int):
+    """Write FSM record synchronously."""
+    if state is None and not data:
+        BotState.objects.filter(key=key).delete()
+        return
+    values = {
+        'state': state,
+        'data': dumps(data),
+        'expires_at': timezone.now() + timedelta(seconds=ttl),
+    }
+    # Plain UPDATE, then INSERT: one query for existing keys and no read-then-write
+    # transaction (which SQLite fails with "database is locked" under concurrency)
+    if BotState.objects.filter(key=key).update(**values):
+        return
+    try:
+        BotState.objects.create(key=key, **values)
+    except IntegrityError:
+        BotState.objects.filter(key=key).update(**values)
+
+
+@db_sync_to_async
+def _delete_expired() -> int:
+    """Delete expired FSM records synchronously."""
+    deleted, _ = BotState.objects.filter(expires_at__lte=timezone.now()).delete()
+    return deleted
+
+
+class DjangoStorage(BaseStorage):
+    """FSM storage backed by the BotState table."""
+
+    def __init__(self, ttl: int = FSM_STATE_TTL) -> None:
+        self.ttl = ttl
+
+    @staticmethod
+    def build_key(key: StorageKey) -> str:
+        """Build row key from storage key."""
+        return f"{key.bot_id}:{key.chat_id}:{key.user_id}:{key.thread_id or ''}:{key.destiny}"
+
+    def create_isolation(self) -> "DjangoEventIsolation":
+        return DjangoEventIsolation(self)
+
+    @asynccontextmanager
+    async def batch(self) -> AsyncGenerator[None, None]:
+        """Collect writes made inside the block and flush them once at the end."""
+        token = _pending.set({})
+        try:
+            yield
+        finally:
+            pending = _pending.get()
+            _pending.reset(token)
+            for key, record in pending.items():
+                if record.dirty:
+                    await _write_record(self.build_key(key), record.state, record.data, self.ttl)
+
+    async def _load(self, key: StorageKey) -> _Record:
+        pending = _pending.get()
+        if pending is not None and key in pending:
+            return pending[key]
+        record = await _read_record(self.build_key(key))
+        if pending is not None:
+            pending[key] = record
+        return record
+
+    async def _store(self, key: StorageKey, record: _Record) -> None:
+        if _pending.get() is not None:
+            record.dirty = True
+            return
+        await _write_record(self.build_key(key), record.state, record.data, self.ttl)
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        record = await self._load(key)
+        record.state = state.state if isinstance(state, State) else state
+        await self._store(key, record)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        return (await self._load(key)).state
+
+    async def set_data(self, key: StorageKey, data: Dict[str, Any]) -> None:
+        record = await self._load(key)
+        record.data = data.copy()
+        await self._store(key, record)
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        return (await self._load(key)).data.copy()
+
+    async def purge_expired(self) -> int:
+        """Remove records whose TTL has passed."""
+        return await _delete_expired()
+
+    async def close(self) -> None:
+        pass
+
+
+@dataclass
+class _KeyLock:
+    """Lock of one key and the number of updates holding or waiting for it."""
+    lock: Lock = field(default_factory=Lock)
+    users: int = 0
+
+
+class DjangoEventIsolation(BaseEventIsolation):
+    """Serializes updates per key and wraps each one in a storage batch."""
+
+    def __init__(self, storage: DjangoStorage) -> None:
+        self.storage = storage
+        # Only keys with an update in progress or waiting, so the map stays small
+        self._locks: Dict[StorageKey, _KeyLock] = {}
+
+    @asynccontextmanager
+    async def lock(self, key: StorageKey) -> AsyncGenerator[None, None]:
+        key_lock = self._locks.get(key)
+        if key_lock is None:
+            key_lock = self._locks[key] = _KeyLock()
+        key_lock.users += 1
+        try:
+            async with key_lock.lock:
+                async with self.storage.batch():
+                    yield
+        finally:
+            key_lock.users -= 1
+            if not key_lock.users:
+                del self._locks[key]
+
+    async def close(self) -> None:
+        self._locks.clear()
+
+
+def create_storage(backend: str = FSM_STORAGE) -> BaseStorage:
+    """Create FSM storage for the configured backend."""
+    if backend == 'memory':
+        return MemoryStorage()
+    if backend == 'redis':
+        # Requires the optional `redis` package
+        from aiogram.fsm.storage.redis import RedisStorage
+        return RedisStorage.from_url(
+            REDIS_URL,
+            state_ttl=FSM_STATE_TTL,
+            data_ttl=FSM_STATE_TTL,
+            json_loads=loads,
+            json_dumps=dumps,
+        )
+    return DjangoStorage()
@@ -0,0 +1,51 @@
+"""
+Coordinated bot shutdown.
+
+On SIGTERM aiogram stops polling (or the webhook server stops accepting
+requests) and runs dispatcher shutdown hooks. graceful_shutdown() then waits
+for updates in progress, confirms the polling offset, flushes analytics and
+drains the outbox, saving undelivered messages for replay on the next start.
+"""
+import logging
+from time import monotonic
+from aiogram import Bot
+from bot.config import BOT_SHUTDOWN_TIMEOUT
+from bot.middlewares.in_flight import InFlightMiddleware
+from bot.services.analytics_service import analytics_buffer
+from bot.services.outbox import get_outbox
+
+logger = logging.getLogger(__name__)
+
+
+async def graceful_shutdown(
+    bot: Bot,
+    in_flight: InFlightMiddleware,
+    polling: bool = False,
+    timeout: float = BOT_SHUTDOWN_TIMEOUT
+):
+    """Finish in-flight work within `timeout` seconds and persist what is left."""
+    deadline = monotonic() + timeout
+
+    if not await in_flight.wait_idle(timeout):
+        logger.warning("Shutdown timeout: %s updates still in progress", in_flight.count)
+
+    if polling and in_flight.last_update_id is not None:
+        # Tell Telegram which updates were handled, otherwise they come again after restart
+        try:
+            await bot.get_updates(offset=in_flight.last_update_id + 1, limit=1, timeout=0)
+        except Exception as e:
+            logger.warning("Failed to confirm update offset: %s", e)
+
+    await analytics_buffer.close()
+
+    saved = await get_outbox(bot).drain(max(0.0, deadline - monotonic()))
+    if saved:
+        logger.warning("Saved %s undelivered messages for replay on next start", saved)
+    logger.info("Bot shut down gracefully")
+
+
+async def replay_undelivered(bot: Bot):
+    """Queue messages saved by the previous graceful_shutdown()."""
+    replayed = await get_outbox(bot).replay_undelivered()
+    if replayed:
+        logger.info("Replaying %s messages saved at last shutdown", replayed)
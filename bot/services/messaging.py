@@ -1,25 +1,14 @@
 """
 Messaging service for auto-responses.
 """
-from aiogram import Bot
-from bot.config import TELEGRAM_BOT_TOKEN
-from bot.services.database import Application
+import asyncio
+from bot.services.database import Application, db_sync_to_async
+from bot.services.telegram_client import get_bot
+from bot.services.outbox import get_outbox, PRIORITY_AUTO_RESPONSE
 from bot.keyboards.inline import get_whatsapp_keyboard
 from typing import Optional
-from asgiref.sync import sync_to_async
 
-bot_instance: Optional[Bot] = None
-
-
-def get_bot() -> Bot:
-    """Get bot instance."""
-    global bot_instance
-    if bot_instance is None:
-        bot_instance = Bot(token=TELEGRAM_BOT_TOKEN)
-    return bot_instance
-
-
-@sync_to_async
+@db_sync_to_async
 def _get_school_whatsapp(school):
     """Get school WhatsApp phone synchronously."""
     if not school:
@@ -33,142 +22,100 @@ def _get_school_whatsapp(school):
         return None
 
 
-@sync_to_async
-def _format_school_response_sync(application):
-    """Format school response synchronously."""
+# Auto-response templates, filled with str.format_map()
+SCHOOL_RESPONSE_TEMPLATE = (
+    "✅ <b>Спасибо за заявку!</b>\n\n"
+    "🏫 <b>Автошкола:</b> {name}\n"
+    "📍 <b>Адрес:</b> {address}\n"
+    "🏙 <b>Город:</b> {city}\n"
+    "🚗 <b>Категория:</b> {category}\n"
+    "📚 <b>Формат:</b> {format}\n"
+    "{payment}"
+    "\nАвтошкола свяжется с вами в ближайшее время!"
+)
+INSTRUCTOR_RESPONSE_TEMPLATE = (
+    "✅ <b>Спасибо за заявку!</b>\n\n"
+    "👨‍🏫 <b>Инструктор:</b> {name}\n"
+    "🏙 <b>Город:</b> {city}\n"
+    "🚗 <b>Тип авто:</b> {auto_type}\n"
+    "{time}"
+    "{payment}"
+    "\nИнструктор свяжется с вами в ближайшее время!"
+)
+TIME_TEMPLATE = "\n📅 <b>Время:</b> {time_slot:%d.%m.%Y %H:%M}\n"
+KASPI_TEMPLATE = "\n💳 <b>Оплата Kaspi:</b> {link}\n"
+HALYK_TEMPLATE = "💳 <b>Оплата HalykPay:</b> {link}\n"
+WHATSAPP_GREETING = "Здравствуйте! Я оставил(а) заявку через AvtoMat."
+
+
+def _format_payment_links(owner) -> str:
+    links = ""
+    if owner.payment_link_kaspi:
+        links += KASPI_TEMPLATE.format(link=owner.payment_link_kaspi)
+    if owner.payment_link_halyk:
+        links += HALYK_TEMPLATE.format(link=owner.payment_link_halyk)
+    return links
+
+
+def format_school_response(application: Application) -> str:
+    """Format school auto-response message (queries relations; use the async wrapper in handlers)."""
     school = application.school
-    city_name = application.city.name if application.city else ""
-    message = (
-        f"✅ <b>Спасибо за заявку!</b>\n\n"
-        f"🏫 <b>Автошкола:</b> {school.name}\n"
-        f"📍 <b>Адрес:</b> {school.address}\n"
-        f"🏙 <b>Город:</b> {city_name}\n"
-        f"🚗 <b>Категория:</b> {application.category}\n"
-        f"📚 <b>Формат:</b> {application.get_format_display()}\n"
-    )
-    
-    if school.payment_link_kaspi:
-        message += f"\n💳 <b>Оплата Kaspi:</b> {school.payment_link_kaspi}\n"
-    if school.payment_link_halyk:
-        message += f"💳 <b>Оплата HalykPay:</b> {school.payment_link_halyk}\n"
-    
-    message += "\nАвтошкола свяжется с вами в ближайшее время!"
-    return message
+    return SCHOOL_RESPONSE_TEMPLATE.format_map({
+        'name': school.name,
+        'address': school.address,
+        'city': application.city.name if application.city else "",
+        'category': application.category,
+        'format': application.get_format_display(),
+        'payment': _format_payment_links(school),
+    })
 
 
-@sync_to_async
-def _format_instructor_response_sync(application):
-    """Format instructor response synchronously."""
+def format_instructor_response(application: Application) -> str:
+    """Format instructor auto-response message (queries relations; use the async wrapper in handlers)."""
     instructor = application.instructor
-    city_name = application.city.name if application.city else ""
-    time_info = ""
-    if application.time_slot:
-        time_info = f"\n📅 <b>Время:</b> {application.time_slot.strftime('%d.%m.%Y %H:%M')}\n"
-    
-    message = (
-        f"✅ <b>Спасибо за заявку!</b>\n\n"
-        f"👨‍🏫 <b>Инструктор:</b> {instructor.name}\n"
-        f"🏙 <b>Город:</b> {city_name}\n"
-        f"🚗 <b>Тип авто:</b> {instructor.get_auto_type_display()}\n"
-        f"{time_info}"
-    )
-    
-    if instructor.payment_link_kaspi:
-        message += f"\n💳 <b>Оплата Kaspi:</b> {instructor.payment_link_kaspi}\n"
-    if instructor.payment_link_halyk:
-        message += f"💳 <b>Оплата HalykPay:</b> {instructor.payment_link_halyk}\n"
-    
-    message += "\nИнструктор свяжется с вами в ближайшее время!"
-    return message
+    return INSTRUCTOR_RESPONSE_TEMPLATE.format_map({
+        'name': instructor.name,
+        'city': application.city.name if application.city else "",
+        'auto_type': instructor.get_auto_type_display(),
+        'time': TIME_TEMPLATE.format(time_slot=application.time_slot) if application.time_slot else "",
+        'payment': _format_payment_links(instructor),
+    })
 
 
-async def send_auto_response_to_user(telegram_id: int, application: Application):
-    """Send auto-response message to user."""
-    bot = get_bot()
-    
+_format_school_response = db_sync_to_async(format_school_response)
+_format_instructor_response = db_sync_to_async(format_instructor_response)
+
+
+async def send_auto_response_to_user(telegram_id: int, application: Application) -> Optional[asyncio.Future]:
+    """Queue auto-response message to user; returns future resolving to delivery result."""
     if application.school:
-        message = await _format_school_response_sync(application)
+        message = await _format_school_response(application)
         whatsapp_phone = await _get_school_whatsapp(application.school)
     elif application.instructor:
-        message = await _format_instructor_response_sync(application)
+        message = await _format_instructor_response(application)
         whatsapp_phone = application.instructor.phone
     else:
-        return
+        return None
     
     # Send message
     if whatsapp_phone:
-        keyboard = get_whatsapp_keyboard(
-            whatsapp_phone,
-            text=f"Здравствуйте! Я оставил(а) заявку через AvtoMat."
-        )
+        keyboard = get_whatsapp_keyboard(whatsapp_phone, text=WHATSAPP_GREETING)
     else:
         keyboard = None
     
-    try:
-        await bot.send_message(
-            chat_id=telegram_id,
-            text=message,
-            reply_markup=keyboard,
-            parse_mode='HTML'
-        )
-    except Exception as e:
-        print(f"Error sending message: {e}")
-
-
-# Legacy functions kept for compatibility, but should use async versions
-def format_school_response(application: Application) -> str:
-    """Format school auto-response message (sync version - use async version in async context)."""
-    # This function should not be used in async context
-    # Use _format_school_response_sync instead
-    school = application.school
-    city_name = application.city.name if application.city else ""
-    message = (
-        f"✅ <b>Спасибо за заявку!</b>\n\n"
-        f"🏫 <b>Автошкола:</b> {school.name}\n"
-        f"📍 <b>Адрес:</b> {school.address}\n"
-        f"🏙 <b>Город:</b> {city_name}\n"
-        f"🚗 <b>Категория:</b> {application.category}\n"
-        f"📚 <b>Формат:</b> {application.get_format_display()}\n"
+    return get_outbox(get_bot()).send(
+        chat_id=telegram_id,
+        text=message,
+        reply_markup=keyboard,
+        parse_mode='HTML',
+        priority=PRIORITY_AUTO_RESPONSE
     )
-    
-    if school.payment_link_kaspi:
-        message += f"\n💳 <b>Оплата Kaspi:</b> {school.payment_link_kaspi}\n"
-    if school.payment_link_halyk:
-        message += f"💳 <b>Оплата HalykPay:</b> {school.payment_link_halyk}\n"
-    
-    message += "\nАвтошкола свяжется с вами в ближайшее время!"
-    return message
-
-
-def format_instructor_response(application: Application) -> str:
-    """Format instructor auto-response message (sync version - use async version in async context)."""
-    # This function should not be used in async context
-    # Use _format_instructor_response_sync instead
-    instructor = application.instructor
-    city_name = application.city.name if application.city else ""
-    time_info = ""
-    if application.time_slot:
-        time_info = f"\n📅 <b>Время:</b> {application.time_slot.strftime('%d.%m.%Y %H:%M')}\n"
-    
-    message = (
-        f"✅ <b>Спасибо за заявку!</b>\n\n"
-        f"👨‍🏫 <b>Инструктор:</b> {instructor.name}\n"
-        f"🏙 <b>Город:</b> {city_name}\n"
-        f"🚗 <b>Тип авто:</b> {instructor.get_auto_type_display()}\n"
-        f"{time_info}"
-    )
-    
-    if instructor.payment_link_kaspi:
-        message += f"\n💳 <b>Оплата Kaspi:</b> {instructor.payment_link_kaspi}\n"
-    if instructor.payment_link_halyk:
-        message += f"💳 <b>Оплата HalykPay:</b> {instructor.payment_link_halyk}\n"
-    
-    message += "\nИнструктор свяжется с вами в ближайшее время!"
-    return message
 
 
 async def send_auto_response(application: Application):
-    """Send auto-response (used from CRM)."""
+    """Send auto-response (used from CRM) and wait for delivery."""
     if application.student and application.student.telegram_id:
-        await send_auto_response_to_user(application.student.telegram_id, application)
+        delivered = await send_auto_response_to_user(application.student.telegram_id, application)
+        if delivered is not None and not await delivered:
+            raise RuntimeError("Сообщение не доставлено, причина записана в «Недоставленные сообщения»")
 
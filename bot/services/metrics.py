@@ -0,0 +1,226 @@
+"""
+In-process metrics exported in Prometheus text format.
+
+A deliberately small registry (counters, gauges, histograms with fixed
+labels) so the bot does not need prometheus_client. Served on a local
+port by start_metrics_server(), next to the polling or webhook loop.
+"""
+import threading
+from bisect import bisect_left
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from aiohttp import web
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Metric:
+    """Base class: a named metric with a fixed set of label names."""
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        lines.extend(self.samples())
+        return lines
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.values: Dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1):
+        with self._lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self) -> Iterable[str]:
+        for labels, value in sorted(self.values.items()):
+            yield f'{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}'
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def dec(self, *labels: str, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels: str, value: float):
+        with self._lock:
+            self.values[labels] = value
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, *args, buckets: Sequence[float] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (+Inf last), sum, count]
+        self.values: Dict[Labels, list] = {}
+
+    def observe(self, value: float, *labels: str):
+        with self._lock:
+            entry = self.values.get(labels)
+            if entry is None:
+                entry = self.values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][bisect_left(self.buckets, value)] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def samples(self) -> Iterable[str]:
+        for labels, (counts, total, count) in sorted(self.values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else _format_value(bound)
+                bucket_labels = _format_labels(self.labelnames, labels, f'le="{le}"')
+                yield f'{self.name}_bucket{bucket_labels} {cumulative}'
+            yield f'{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}'
+            yield f'{self.name}_count{_format_labels(self.labelnames, labels)} {count}'
+
+
+class CallbackMetric(Metric):
+    """Metric whose values are read from a callback at scrape time."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str],
+                 kind: str, collect: Callable[[], Dict[Labels, float]]):
+        super().__init__(name, documentation, labelnames)
+        self.kind = kind
+        self.collect = collect
+
+    def samples(self) -> Iterable[str]:
+        for labels, value in sorted(self.collect().items()):
+            yield f'{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}'
+
+
+class MetricsRegistry:
+    """Named metrics rendered together."""
+
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets=buckets))
+
+    def callback(self, name: str, documentation: str, labelnames: Sequence[str], kind: str,
+                 collect: Callable[[], Dict[Labels, float]]) -> CallbackMetric:
+        """Register (or replace) a metric read from `collect` at scrape time."""
+        return self.register(CallbackMetric(name, documentation, labelnames, kind, collect))
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self.metrics.values()):
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+HANDLER_DURATION = registry.histogram(
+    'bot_handler_duration_seconds', 'Handler latency.', ('router', 'handler'))
+HANDLER_ERRORS = registry.counter(
+    'bot_handler_errors_total', 'Handler calls that raised.', ('router', 'handler'))
+HANDLER_IN_FLIGHT = registry.gauge(
+    'bot_handler_in_flight', 'Handler calls currently running.', ('router', 'handler'))
+UPDATE_DURATION = registry.histogram(
+    'bot_update_duration_seconds', 'Time to process an update, including waits for locks.', ('type',))
+UPDATE_DB_DURATION = registry.histogram(
+    'bot_update_db_seconds', 'Database time spent per update.', ('type',))
+UPDATE_DB_QUERIES = registry.counter(
+    'bot_update_db_queries_total', 'Database queries issued while handling updates.', ('type',))
+
+
+class DbStats:
+    """Database time and query count of one update."""
+    __slots__ = ('seconds', 'queries')
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.queries = 0
+
+
+# Set for the duration of an update; ORM threads see it through the copied context
+current_db_stats: ContextVar[Optional[DbStats]] = ContextVar('current_db_stats', default=None)
+
+
+def _time_query(execute, sql, params, many, context):
+    stats = current_db_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.seconds += perf_counter() - started
+        stats.queries += 1
+
+
+def _install_on_connection(sender, connection, **kwargs):
+    if _time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_time_query)
+
+
+def install_db_timer():
+    """Time queries on every database connection (existing and future)."""
+    connection_created.connect(_install_on_connection, dispatch_uid='bot-metrics-db-timer')
+    for connection in connections.all():
+        _install_on_connection(None, connection)
+
+
+async def _metrics_view(request: web.Request) -> web.Response:
+    return web.Response(
+        body=registry.render().encode(),
+        headers={'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+    )
+
+
+async def start_metrics_server(host: str, port: int) -> web.AppRunner:
+    """Serve GET /metrics on host:port; returns the runner to clean up."""
+    app = web.Application()
+    app.router.add_get('/metrics', _metrics_view)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
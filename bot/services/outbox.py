@@ -0,0 +1,224 @@
+"""
+Outbound message queue with priority lanes and a dead-letter table.
+
+Messages are sent by a small pool of workers in priority order. Rate
+limiting and flood retries happen in the bot session (see rate_limit.py);
+messages that still fail are stored in DeadLetter. Messages still queued
+at shutdown are stored there too and sent again on the next start.
+"""
+import asyncio
+import contextvars
+import itertools
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+from aiogram import Bot
+from aiogram.exceptions import TelegramAPIError
+from aiogram.types import InlineKeyboardMarkup
+from django.db import transaction
+from django.utils import timezone
+from bot.config import OUTBOX_WORKERS
+from bot.services.database import DeadLetter, db_sync_to_async
+
+logger = logging.getLogger(__name__)
+
+# Priority lanes (lower is sent first)
+PRIORITY_AUTO_RESPONSE = 0
+PRIORITY_NOTIFICATION = 5
+PRIORITY_BROADCAST = 10
+
+# DeadLetter.error of messages that were queued when the bot stopped
+SHUTDOWN_ERROR = 'Not sent before shutdown'
+
+
+@dataclass(order=True)
+class OutboundMessage:
+    """Queued message; ordered by priority, then FIFO."""
+    priority: int
+    seq: int
+    chat_id: int = field(compare=False)
+    text: str = field(compare=False)
+    parse_mode: Optional[str] = field(default=None, compare=False)
+    reply_markup: Optional[InlineKeyboardMarkup] = field(default=None, compare=False)
+    future: Optional[asyncio.Future] = field(default=None, compare=False)
+
+    def payload(self) -> Dict[str, Any]:
+        """JSON-friendly copy of the message body."""
+        return {
+            'text': self.text,
+            'parse_mode': self.parse_mode,
+            'reply_markup': self.reply_markup.model_dump(exclude_none=True) if self.reply_markup else None,
+        }
+
+
+@db_sync_to_async
+def _save_dead_letter(message: OutboundMessage, error: str, attempts: int):
+    """Save undelivered message synchronously."""
+    return DeadLetter.objects.create(
+        chat_id=message.chat_id,
+        payload=message.payload(),
+        priority=message.priority,
+        attempts=attempts,
+        error=error
+    )
+
+
+@db_sync_to_async
+def _save_undelivered(messages: List[OutboundMessage]):
+    """Save messages left in the queue at shutdown synchronously."""
+    DeadLetter.objects.bulk_create([
+        DeadLetter(
+            chat_id=message.chat_id,
+            payload=message.payload(),
+            priority=message.priority,
+            error=SHUTDOWN_ERROR
+        )
+        for message in messages
+    ])
+
+
+@db_sync_to_async
+def _claim_undelivered() -> List[DeadLetter]:
+    """Take messages saved at the last shutdown, marking them replayed, synchronously."""
+    with transaction.atomic():
+        letters = list(
+            DeadLetter.objects.select_for_update()
+            .filter(error=SHUTDOWN_ERROR, replayed_at__isnull=True)
+            .order_by('priority', 'id')
+        )
+        DeadLetter.objects.filter(id__in=[letter.id for letter in letters]).update(replayed_at=timezone.now())
+    return letters
+
+
+class Outbox:
+    """Priority queue of outbound messages processed by background workers."""
+
+    def __init__(self, bot: Bot, workers: int = OUTBOX_WORKERS):
+        self.bot = bot
+        self.workers = workers
+        self.queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self.loop = asyncio.get_running_loop()
+        self._seq = itertools.count()
+        self._tasks: List[asyncio.Task] = []
+        self._sending: Dict[int, OutboundMessage] = {}  # seq -> message being sent
+
+    def start(self):
+        """Start worker tasks if not running yet."""
+        if not self._tasks:
+            # Fresh context: workers outlive the update that happened to start them
+            self._tasks = [
+                asyncio.create_task(self._worker(), context=contextvars.Context())
+                for _ in range(self.workers)
+            ]
+
+    def send(
+        self,
+        chat_id: int,
+        text: str,
+        parse_mode: Optional[str] = None,
+        reply_markup: Optional[InlineKeyboardMarkup] = None,
+        priority: int = PRIORITY_BROADCAST
+    ) -> asyncio.Future:
+        """Queue a message. The returned future resolves to True once delivered, False if dead-lettered."""
+        self.start()
+        message = OutboundMessage(
+            priority=priority,
+            seq=next(self._seq),
+            chat_id=chat_id,
+            text=text,
+            parse_mode=parse_mode,
+            reply_markup=reply_markup,
+            future=self.loop.create_future()
+        )
+        self.queue.put_nowait(message)
+        return message.future
+
+    async def _worker(self):
+        while True:
+            message = await self.queue.get()
+            self._sending[message.seq] = message
+            try:
+                await self.bot.send_message(
+                    chat_id=message.chat_id,
+                    text=message.text,
+                    parse_mode=message.parse_mode,
+                    reply_markup=message.reply_markup
+                )
+                delivered = True
+            except TelegramAPIError as e:
+                logger.error("Message to %s failed, moving to dead letters: %s", message.chat_id, e)
+                await self._dead_letter(message, str(e), getattr(e, 'attempts', 1))
+                delivered = False
+            except Exception as e:
+                logger.error("Unexpected error sending to %s: %s", message.chat_id, e, exc_info=True)
+                await self._dead_letter(message, repr(e), getattr(e, 'attempts', 1))
+                delivered = False
+            finally:
+                self.queue.task_done()
+            del self._sending[message.seq]
+            if not message.future.done():
+                message.future.set_result(delivered)
+
+    async def _dead_letter(self, message: OutboundMessage, error: str, attempts: int):
+        """Store a failed message; a database error is logged so the worker keeps running."""
+        try:
+            await _save_dead_letter(message, error, attempts)
+        except Exception as e:
+            logger.error("Failed to save dead letter for %s: %s", message.chat_id, e, exc_info=True)
+
+    async def join(self):
+        """Wait until everything queued so far has been handled."""
+        await self.queue.join()
+
+    async def stop(self):
+        """Cancel worker tasks."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def drain(self, timeout: float) -> int:
+        """Send what is queued within `timeout`, then stop and save the rest; returns the number saved."""
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        await self.stop()
+
+        # Messages interrupted mid-send are saved too: a rare duplicate beats a lost reply
+        undelivered = list(self._sending.values())
+        self._sending.clear()
+        while not self.queue.empty():
+            undelivered.append(self.queue.get_nowait())
+            self.queue.task_done()
+        if undelivered:
+            await _save_undelivered(undelivered)
+            for message in undelivered:
+                if not message.future.done():
+                    message.future.set_result(False)
+        return len(undelivered)
+
+    async def replay_undelivered(self) -> int:
+        """Queue messages saved by drain() on the previous run; returns how many."""
+        letters = await _claim_undelivered()
+        for letter in letters:
+            reply_markup = letter.payload.get('reply_markup')
+            self.send(
+                chat_id=letter.chat_id,
+                text=letter.payload['text'],
+                parse_mode=letter.payload.get('parse_mode'),
+                reply_markup=InlineKeyboardMarkup.model_validate(reply_markup) if reply_markup else None,
+                priority=letter.priority
+            )
+        return len(letters)
+
+
+_outbox: Optional[Outbox] = None
+
+
+def get_outbox(bot: Bot) -> Outbox:
+    """Get outbox bound to the running event loop."""
+    global _outbox
+    if _outbox is None or _outbox.loop is not asyncio.get_running_loop():
+        _outbox = Outbox(bot)
+    return _outbox
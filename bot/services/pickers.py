@@ -0,0 +1,125 @@
+"""
+City, school and instructor pickers.
+
+The city keyboard is built from active City rows and rebuilt only when the
+catalog changes. School and instructor pages are cut from the in-memory
+catalog with keyset cursors (see core.catalog.keyset_page), so only the
+rows on screen are rendered. Rendered pages are cached per catalog
+version, city and cursor.
+"""
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+from aiogram.types import InlineKeyboardMarkup
+from bot.config import CITIES, PICKER_PAGE_SIZE
+from bot.keyboards.inline import (
+    build_static_keyboards, get_cities_keyboard,
+    get_schools_keyboard, get_instructors_keyboard
+)
+from core.catalog import catalog, Page
+
+# Rendered pages kept in memory; older entries are evicted first
+PAGE_CACHE_SIZE = 1024
+
+RenderedPage = Tuple[str, InlineKeyboardMarkup]
+
+_page_cache: "OrderedDict[Hashable, Any]" = OrderedDict()
+
+
+def _cached(key: Hashable, render: Callable[[], Any]) -> Any:
+    try:
+        _page_cache.move_to_end(key)
+        return _page_cache[key]
+    except KeyError:
+        pass
+    page = _page_cache[key] = render()
+    if len(_page_cache) > PAGE_CACHE_SIZE:
+        _page_cache.popitem(last=False)
+    return page
+
+
+def parse_page_callback(data: str) -> Tuple[Optional[str], bool]:
+    """Split '<prefix>:<prev|next>:<cursor>' into (cursor, backwards)."""
+    _, direction, cursor = (data.split(':', 2) + ['', ''])[:3]
+    return cursor or None, direction == 'prev'
+
+
+def _city_names() -> Tuple[str, ...]:
+    # Configured order first, then cities added later in alphabetical order
+    names = [city.name for city in catalog.get_cities()]
+    if not names:
+        return tuple(CITIES)
+    order = {name: index for index, name in enumerate(CITIES)}
+    return tuple(sorted(names, key=lambda name: (order.get(name, len(order)), name)))
+
+
+async def get_cities_picker() -> InlineKeyboardMarkup:
+    """Keyboard with active cities."""
+    await catalog.aensure_fresh()
+    return _cached(('cities', catalog.version), lambda: get_cities_keyboard(_city_names()))
+
+
+async def warm_up():
+    """Load the catalog and build shared keyboards; called on startup."""
+    build_static_keyboards()
+    await get_cities_picker()
+
+
+def _render_schools(page: Page) -> Optional[RenderedPage]:
+    if not page.items:
+        return None
+    text = "🏫 Доступные автошколы:\n\n"
+    for school in page.items:
+        text += (
+            f"• {school.name}\n"
+            f"  ⭐ Рейтинг: {school.rating}\n"
+            f"  📍 {school.address}\n"
+            f"  💰 Цена: уточняйте\n\n"
+        )
+    keyboard = get_schools_keyboard(page.items, page.prev_cursor, page.next_cursor)
+    return text + "Выберите автошколу:", keyboard
+
+
+def _render_instructors(page: Page) -> Optional[RenderedPage]:
+    if not page.items:
+        return None
+    text = "👨‍🏫 Доступные инструкторы:\n\n"
+    for instructor in page.items:
+        text += (
+            f"• {instructor.name}\n"
+            f"  🚗 {instructor.get_auto_type_display()}\n"
+            f"  ⭐ Рейтинг: {instructor.rating}\n"
+            f"  📞 {instructor.phone}\n\n"
+        )
+    keyboard = get_instructors_keyboard(page.items, page.prev_cursor, page.next_cursor)
+    return text + "Выберите инструктора:", keyboard
+
+
+async def get_schools_page(
+    city_name: str,
+    cursor: Optional[str] = None,
+    backwards: bool = False
+) -> Optional[RenderedPage]:
+    """Text and keyboard for a page of schools in a city (None if there are none)."""
+    if not city_name:
+        return None
+    await catalog.aensure_fresh()
+    key = ('schools', catalog.version, city_name, cursor, backwards)
+    return _cached(key, lambda: _render_schools(
+        catalog.get_schools_page(city_name, cursor, backwards, PICKER_PAGE_SIZE)
+    ))
+
+
+async def get_instructors_page(
+    city_name: str,
+    auto_type: str,
+    cursor: Optional[str] = None,
+    backwards: bool = False
+) -> Optional[RenderedPage]:
+    """Text and keyboard for a page of instructors (None if there are none)."""
+    if not city_name:
+        return None
+    await catalog.aensure_fresh()
+    key = ('instructors', catalog.version, city_name, auto_type, cursor, backwards)
+    return _cached(key, lambda: _render_instructors(
+        catalog.get_instructors_page(city_name, auto_type, cursor, backwards, PICKER_PAGE_SIZE)
+    ))
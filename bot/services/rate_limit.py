@@ -0,0 +1,152 @@
+"""
+Token-bucket rate limiting for outgoing Bot API calls.
+"""
+import asyncio
+import logging
+import random
+from time import monotonic
+from typing import Dict
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram import methods
+from aiogram.exceptions import TelegramRetryAfter, TelegramNetworkError, TelegramServerError
+from bot.config import (
+    OUTBOX_GLOBAL_RATE, OUTBOX_CHAT_RATE, OUTBOX_CHAT_BURST,
+    OUTBOX_MAX_ATTEMPTS, OUTBOX_MAX_RETRY_AFTER
+)
+
+logger = logging.getLogger(__name__)
+
+# Methods that are safe to repeat after a network error, when the first request
+# may have reached Telegram (sending again would duplicate a message)
+IDEMPOTENT_METHODS = (
+    methods.AnswerCallbackQuery,
+    methods.EditMessageText,
+    methods.EditMessageReplyMarkup,
+    methods.EditMessageCaption,
+    methods.DeleteMessage,
+    methods.GetUpdates,
+    methods.GetMe,
+    methods.SetWebhook,
+    methods.DeleteWebhook,
+)
+
+# Idle per-chat buckets are dropped once there are more than this many
+MAX_CHAT_BUCKETS = 10000
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, at most `capacity` stored."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = monotonic()
+        self._lock = asyncio.Lock()  # Waiters are served in FIFO order
+
+    def _refill(self):
+        now = monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    @property
+    def is_full(self) -> bool:
+        self._refill()
+        return self.tokens >= self.capacity
+
+    def try_acquire(self) -> bool:
+        """Take a token if one is available right now."""
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    async def acquire(self):
+        """Wait until a token is available and take it."""
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class RateLimiter:
+    """Global plus per-chat token buckets."""
+
+    def __init__(
+        self,
+        global_rate: float = OUTBOX_GLOBAL_RATE,
+        chat_rate: float = OUTBOX_CHAT_RATE,
+        chat_burst: int = OUTBOX_CHAT_BURST
+    ):
+        self.global_bucket = TokenBucket(global_rate, global_rate)
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.chat_buckets: Dict[int, TokenBucket] = {}
+
+    def _chat_bucket(self, chat_id: int) -> TokenBucket:
+        bucket = self.chat_buckets.get(chat_id)
+        if bucket is None:
+            if len(self.chat_buckets) >= MAX_CHAT_BUCKETS:
+                self.chat_buckets = {
+                    key: value for key, value in self.chat_buckets.items() if not value.is_full
+                }
+            bucket = self.chat_buckets[chat_id] = TokenBucket(self.chat_rate, self.chat_burst)
+        return bucket
+
+    async def acquire(self, chat_id: int):
+        """Wait for both the chat and the global bucket."""
+        await self._chat_bucket(chat_id).acquire()
+        await self.global_bucket.acquire()
+
+
+def jittered(delay: float) -> float:
+    """Add up to 10% (and at least 0-0.5s) random jitter to a delay."""
+    return delay + random.uniform(0, max(0.5, delay * 0.1))
+
+
+class RateLimitMiddleware(BaseRequestMiddleware):
+    """Session middleware that throttles chat-bound calls and retries flood errors.
+
+    Server errors are retried for every method, network errors only for
+    IDEMPOTENT_METHODS. An error given up on carries the number of attempts made in `attempts`.
+    """
+
+    def __init__(
+        self,
+        limiter: RateLimiter,
+        max_attempts: int = OUTBOX_MAX_ATTEMPTS,
+        max_retry_after: int = OUTBOX_MAX_RETRY_AFTER
+    ):
+        self.limiter = limiter
+        self.max_attempts = max_attempts
+        self.max_retry_after = max_retry_after
+
+    async def __call__(self, make_request, bot, method):
+        chat_id = getattr(method, 'chat_id', None)
+        attempt = 0
+        while True:
+            attempt += 1
+            if isinstance(chat_id, int):
+                await self.limiter.acquire(chat_id)
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as e:
+                if attempt >= self.max_attempts or e.retry_after > self.max_retry_after:
+                    e.attempts = attempt
+                    raise
+                delay = jittered(e.retry_after)
+            except (TelegramNetworkError, TelegramServerError) as e:
+                retryable = isinstance(e, TelegramServerError) or isinstance(method, IDEMPOTENT_METHODS)
+                if not retryable or attempt >= self.max_attempts:
+                    e.attempts = attempt
+                    raise
+                delay = jittered(2 ** (attempt - 1))
+            logger.warning(
+                "Retrying %s for chat %s in %.1fs (attempt %s/%s)",
+                type(method).__name__, chat_id, delay, attempt, self.max_attempts
+            )
+            await asyncio.sleep(delay)
@@ -0,0 +1,90 @@
+"""
+Shared Bot API client.
+
+One Bot (and therefore one pooled aiohttp session) per process. Sync code,
+such as CRM views, submits coroutines to a long-lived background event loop
+via run_sync() instead of spinning up a new loop with asyncio.run().
+"""
+import asyncio
+import atexit
+import threading
+from typing import Any, Coroutine, Optional
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from bot.config import TELEGRAM_BOT_TOKEN, TELEGRAM_API_URL, OUTBOX_GLOBAL_RATE
+from bot.middlewares.throttling import PreAnsweredMiddleware
+from bot.services.rate_limit import RateLimiter, RateLimitMiddleware
+
+# Seconds a sync caller waits for a coroutine submitted with run_sync()
+SYNC_CALL_TIMEOUT = 30
+
+_bot: Optional[Bot] = None
+_bot_lock = threading.Lock()
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def create_bot(
+    token: str = TELEGRAM_BOT_TOKEN,
+    api_url: str = TELEGRAM_API_URL,
+    global_rate: float = OUTBOX_GLOBAL_RATE
+) -> Bot:
+    """Create bot whose requests are rate limited and retried on flood errors."""
+    if api_url:
+        session = AiohttpSession(api=TelegramAPIServer.from_base(api_url))
+    else:
+        session = AiohttpSession()
+    session.middleware(PreAnsweredMiddleware())
+    session.middleware(RateLimitMiddleware(RateLimiter(global_rate=global_rate)))
+    return Bot(token=token, session=session)
+
+
+def get_bot() -> Bot:
+    """Get the process-wide bot instance."""
+    global _bot
+    if _bot is None:
+        with _bot_lock:
+            if _bot is None:
+                _bot = create_bot()
+    return _bot
+
+
+def set_bot(bot: Bot):
+    """Replace the process-wide bot, e.g. with one on a fake session for benchmarks."""
+    global _bot
+    with _bot_lock:
+        _bot = bot
+
+
+def _get_background_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever, name='telegram-client-loop', daemon=True
+                )
+                thread.start()
+                _loop = loop
+    return _loop
+
+
+def run_sync(coro: Coroutine, timeout: float = SYNC_CALL_TIMEOUT) -> Any:
+    """Run coroutine on the shared background loop and wait for its result."""
+    future = asyncio.run_coroutine_threadsafe(coro, _get_background_loop())
+    return future.result(timeout)
+
+
+@atexit.register
+def _close_background_loop():
+    """Close the bot session opened on the background loop."""
+    if _loop is None or not _loop.is_running():
+        return
+    if _bot is not None:
+        try:
+            asyncio.run_coroutine_threadsafe(_bot.session.close(), _loop).result(5)
+        except Exception:
+            pass
+    _loop.call_soon_threadsafe(_loop.stop)
@@ -0,0 +1,106 @@
+"""
+Logging setup for bot processes.
+
+Handlers only put records on a queue; formatting and writing to stdout or
+disk happen in a QueueListener thread, so the event loop never blocks on
+I/O. Every record carries the id of the update being handled (set by
+CorrelationIdMiddleware). INFO and lower records can be sampled per call
+site with extra={'sample': rate}; sampling is off at DEBUG level.
+"""
+import atexit
+import copy
+import json
+import logging
+import random
+import sys
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+from typing import Optional
+from bot.config import LOG_LEVEL, LOG_FORMAT, LOG_FILE, LOG_SAMPLE_RATE
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - [%(update_id)s] %(message)s'
+
+update_id_var: ContextVar[Optional[int]] = ContextVar('update_id', default=None)
+
+
+class ContextFilter(logging.Filter):
+    """Attach the current update id to the record."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        update_id = update_id_var.get()
+        record.update_id = '-' if update_id is None else update_id
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keep INFO and lower records with probability extra['sample'] * rate."""
+
+    def __init__(self, rate: float = LOG_SAMPLE_RATE):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = getattr(record, 'sample', 1.0) * self.rate
+        return rate >= 1 or random.random() < rate
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'update_id': getattr(record, 'update_id', None),
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class LoopQueueHandler(QueueHandler):
+    """QueueHandler that leaves formatting to the listener thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge args now since they may change later; keep exc_info for the listener
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+_listener: Optional[QueueListener] = None
+
+
+def setup_logging(level: str = LOG_LEVEL, log_file: str = LOG_FILE, fmt: str = LOG_FORMAT) -> QueueListener:
+    """Route all logging through a background listener; safe to call once per process."""
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    formatter = JsonFormatter() if fmt == 'json' else logging.Formatter(TEXT_FORMAT)
+    handlers = [logging.StreamHandler(sys.stdout)]
+    if log_file:
+        handlers.append(logging.FileHandler(log_file, encoding='utf-8'))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    queue = SimpleQueue()
+    queue_handler = LoopQueueHandler(queue)
+    queue_handler.addFilter(ContextFilter())
+    if logging.getLevelName(level) > logging.DEBUG:
+        queue_handler.addFilter(SamplingFilter())
+
+    root = logging.getLogger()
+    root.handlers[:] = [queue_handler]
+    root.setLevel(level)
+
+    _listener = QueueListener(queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+    return _listener
@@ -0,0 +1,168 @@
+"""
+Webhook entry point for Telegram bot.
+
+Updates are acknowledged as soon as they are queued and handled by a fixed
+pool of workers. When the queue is full the server answers 503 so Telegram
+retries later instead of piling up tasks.
+
+Run locally and replay a recorded update:
+
+    WEBHOOK_SECRET=dev python -m bot.webhook
+    curl -X POST -H 'X-Telegram-Bot-Api-Secret-Token: dev' \\
+         -H 'Content-Type: application/json' -d @update.json \\
+         http://localhost:8080/webhook
+"""
+import asyncio
+import hmac
+import logging
+from typing import List, Optional
+from aiohttp import web
+from aiogram import Bot, Dispatcher
+from aiogram.types import Update
+from bot.config import (
+    TELEGRAM_BOT_TOKEN, WEBHOOK_URL, WEBHOOK_PATH, WEBHOOK_SECRET,
+    WEBHOOK_HOST, WEBHOOK_PORT, WEBHOOK_WORKERS, WEBHOOK_QUEUE_SIZE,
+    BOT_SHUTDOWN_TIMEOUT
+)
+from bot.dispatcher import create_dispatcher
+from bot.services.telegram_client import get_bot
+from bot.utils.logs import setup_logging
+
+# Configure logging
+setup_logging()
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = 'X-Telegram-Bot-Api-Secret-Token'
+
+
+class WebhookServer:
+    """Accepts webhook updates and processes them on a bounded worker pool."""
+
+    def __init__(
+        self,
+        bot: Bot,
+        dp: Dispatcher,
+        secret: str = WEBHOOK_SECRET,
+        webhook_url: str = WEBHOOK_URL,
+        workers: int = WEBHOOK_WORKERS,
+        queue_size: int = WEBHOOK_QUEUE_SIZE
+    ):
+        self.bot = bot
+        self.dp = dp
+        self.secret = secret
+        self.webhook_url = webhook_url  # Empty = don't register
+        self.workers = workers
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.in_flight = 0
+        self.processed = 0
+        self.rejected = 0
+        self.accepting = True
+        self._tasks: List[asyncio.Task] = []
+
+    def create_app(self, path: str = WEBHOOK_PATH) -> web.Application:
+        """Create aiohttp application with webhook and status routes."""
+        app = web.Application()
+        app.router.add_post(path, self.handle_update)
+        app.router.add_get('/status', self.handle_status)
+        app.on_startup.append(self.on_startup)
+        app.on_shutdown.append(self.on_shutdown)
+        return app
+
+    async def handle_update(self, request: web.Request) -> web.Response:
+        """Validate and enqueue an update, answering immediately."""
+        if self.secret:
+            received = request.headers.get(SECRET_HEADER, '')
+            if not hmac.compare_digest(received, self.secret):
+                return web.Response(status=401)
+
+        if not self.accepting:
+            # Shutting down: Telegram redelivers the update to the next instance
+            return web.Response(status=503, headers={'Retry-After': '1'})
+
+        try:
+            update = Update.model_validate(await request.json(), context={'bot': self.bot})
+        except Exception as e:
+            logger.warning("Invalid update payload: %s", e)
+            return web.Response(status=400)
+
+        try:
+            self.queue.put_nowait(update)
+        except asyncio.QueueFull:
+            # Backpressure: Telegram redelivers the update later
+            self.rejected += 1
+            return web.Response(status=503, headers={'Retry-After': '1'})
+
+        return web.Response(status=200)
+
+    async def handle_status(self, request: web.Request) -> web.Response:
+        """Report queue depth and worker pool usage."""
+        return web.json_response({
+            'queue_depth': self.queue.qsize(),
+            'queue_size': self.queue.maxsize,
+            'workers': self.workers,
+            'in_flight': self.in_flight,
+            'processed': self.processed,
+            'rejected': self.rejected,
+        })
+
+    async def _worker(self):
+        while True:
+            update = await self.queue.get()
+            self.in_flight += 1
+            try:
+                await self.dp.feed_update(self.bot, update)
+            except Exception as e:
+                logger.error("Error processing update %s: %s", update.update_id, e, exc_info=True)
+            finally:
+                self.in_flight -= 1
+                self.processed += 1
+                self.queue.task_done()
+
+    async def on_startup(self, app: web.Application):
+        await self.dp.emit_startup(bot=self.bot, dispatcher=self.dp, **self.dp.workflow_data)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+        if self.webhook_url:
+            await self.bot.set_webhook(
+                url=self.webhook_url.rstrip('/') + WEBHOOK_PATH,
+                secret_token=self.secret or None,
+                allowed_updates=self.dp.resolve_used_update_types(),
+                max_connections=self.workers
+            )
+            logger.info("Webhook registered at %s", self.webhook_url)
+
+        logger.info("Webhook server started with %s workers", self.workers)
+
+    async def on_shutdown(self, app: web.Application):
+        # Stop accepting updates and let queued ones finish before stopping workers
+        self.accepting = False
+        try:
+            await asyncio.wait_for(self.queue.join(), BOT_SHUTDOWN_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning("Shutdown timeout: %s queued updates dropped", self.queue.qsize())
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+        await self.dp.emit_shutdown(bot=self.bot, dispatcher=self.dp, **self.dp.workflow_data)
+        await self.bot.session.close()
+
+
+def create_app(bot: Optional[Bot] = None, dp: Optional[Dispatcher] = None) -> web.Application:
+    """Create webhook application with default bot and dispatcher."""
+    bot = bot or get_bot()
+    dp = dp or create_dispatcher()
+    return WebhookServer(bot, dp).create_app()
+
+
+def main():
+    """Run webhook server."""
+    if not TELEGRAM_BOT_TOKEN:
+        logger.error("TELEGRAM_BOT_TOKEN not set in environment variables!")
+        return
+
+    web.run_app(create_app(), host=WEBHOOK_HOST, port=WEBHOOK_PORT)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,7 +3,7 @@ Django admin configuration for core models.
 """
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import User, City, School, Instructor, Application
+from .models import User, City, School, Instructor, Application, DeadLetter
 
 
 @admin.register(User)
@@ -44,3 +44,11 @@ class ApplicationAdmin(admin.ModelAdmin):
     search_fields = ['student_name', 'student_phone']
     readonly_fields = ['created_at', 'updated_at', 'status_changed_at']
 
+
+
+@admin.register(DeadLetter)
+class DeadLetterAdmin(admin.ModelAdmin):
+    list_display = ['chat_id', 'priority', 'attempts', 'error', 'created_at', 'replayed_at']
+    list_filter = ['priority', 'created_at']
+    search_fields = ['chat_id', 'error']
+    readonly_fields = ['created_at']
@@ -0,0 +1,12 @@
+"""
+Core app configuration.
+"""
+from django.apps import AppConfig
+
+
+class CoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'core'
+
+    def ready(self):
+        from core import signals  # noqa: F401
@@ -13,5 +13,8 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
+# Database connection settings for async servers (see DB_ASGI_CONN_MAX_AGE in settings)
+os.environ.setdefault('DJANGO_ASGI', 'true')
+
 application = get_asgi_application()
 
@@ -0,0 +1,257 @@
+"""
+In-memory catalog of active cities, schools and instructors.
+
+The whole active catalog is small and changes a few times a day, so each
+process keeps a copy and serves lookups from memory. Saves and deletes bump
+a version stamp in the database (see core.signals); other processes notice
+it at most CATALOG_VERSION_CHECK_INTERVAL seconds later and reload.
+"""
+import threading
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from time import monotonic
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+from core.models import City, School, Instructor, CatalogVersion
+
+
+def get_catalog_version() -> int:
+    """Current catalog version stored in the database."""
+    return get_catalog_stamp()[0]
+
+
+def get_catalog_stamp() -> Tuple[int, Optional[datetime]]:
+    """Current catalog version and the time it was bumped."""
+    stamp = CatalogVersion.objects.filter(pk=1).values_list('version', 'updated_at').first()
+    return stamp or (0, None)
+
+
+def bump_catalog_version():
+    """Increment catalog version so every process reloads its catalog."""
+    updated = CatalogVersion.objects.filter(pk=1).update(version=F('version') + 1, updated_at=timezone.now())
+    if not updated:
+        CatalogVersion.objects.get_or_create(pk=1, defaults={'version': 1})
+
+
+# Parts of a cursor for each sort key
+SCHOOL_KEY_PARTS = 3
+INSTRUCTOR_KEY_PARTS = 2
+
+
+def school_sort_key(school: School) -> tuple:
+    """Catalog order of schools: (-rating, -trust_index, id)."""
+    return (-school.rating, -school.trust_index, school.id)
+
+
+def instructor_sort_key(instructor: Instructor) -> tuple:
+    """Catalog order of instructors: (-rating, id)."""
+    return (-instructor.rating, instructor.id)
+
+
+def format_cursor(key: tuple) -> str:
+    """Encode a sort key as a compact cursor, e.g. '4.80:95.00:12'."""
+    return ':'.join(str(-part) if isinstance(part, Decimal) else str(part) for part in key)
+
+
+def parse_cursor(cursor: str, parts: int) -> Optional[tuple]:
+    """Decode a cursor of a `parts`-long key produced by format_cursor() (None if malformed)."""
+    *decimals, last_id = cursor.split(':')
+    if len(decimals) != parts - 1:
+        return None
+    try:
+        decimals = [Decimal(part) for part in decimals]
+        last_id = int(last_id)
+    except (ValueError, InvalidOperation):
+        return None
+    # NaN / Infinity would break the comparisons in bisect
+    if not all(part.is_finite() for part in decimals):
+        return None
+    return tuple(-part for part in decimals) + (last_id,)
+
+
+class Page(NamedTuple):
+    """One keyset page of catalog items."""
+    items: list
+    prev_cursor: Optional[str]  # Cursor to pass with backwards=True, None on the first page
+    next_cursor: Optional[str]  # Cursor to pass for the next page, None on the last page
+
+
+def keyset_page(
+    items: Sequence,
+    key: Callable,
+    parts: int,
+    cursor: Optional[str] = None,
+    backwards: bool = False,
+    limit: int = 10
+) -> Page:
+    """Page of `items` (sorted by `key` of `parts` parts) after the cursor, or before it when backwards."""
+    position = parse_cursor(cursor, parts) if cursor else None
+    if position is None:
+        start, end = 0, limit
+    elif backwards:
+        end = bisect_left(items, position, key=key)
+        start = max(0, end - limit)
+    else:
+        start = bisect_right(items, position, key=key)
+        end = start + limit
+    page = list(items[start:end])
+    return Page(
+        items=page,
+        prev_cursor=format_cursor(key(page[0])) if page and start > 0 else None,
+        next_cursor=format_cursor(key(page[-1])) if page and end < len(items) else None,
+    )
+
+
+class CatalogCache:
+    """Versioned snapshot of the active catalog."""
+
+    def __init__(self, check_interval: Optional[float] = None):
+        self.check_interval = check_interval
+        self.version: Optional[int] = None
+        self.updated_at: Optional[datetime] = None  # When the loaded version was bumped
+        self.cities: Dict[str, City] = {}
+        self.schools_by_city: Dict[int, List[School]] = {}
+        self.instructors_by_city: Dict[Tuple[int, str], List[Instructor]] = {}
+        self.schools_by_id: Dict[int, School] = {}
+        self.instructors_by_id: Dict[int, Instructor] = {}
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def needs_check(self) -> bool:
+        """Whether the next lookup has to query the version stamp."""
+        interval = self.check_interval
+        if interval is None:
+            interval = settings.CATALOG_VERSION_CHECK_INTERVAL
+        return self.version is None or monotonic() - self._checked_at >= interval
+
+    def invalidate(self):
+        """Force a version check on the next lookup."""
+        self._checked_at = 0.0
+
+    def ensure_fresh(self):
+        """Reload the catalog if the database version changed (sync, may query)."""
+        if not self.needs_check:
+            return
+        with self._lock:
+            if not self.needs_check:
+                return
+            version, updated_at = get_catalog_stamp()
+            if version != self.version:
+                self._load()
+                self.version = version
+                self.updated_at = updated_at
+            self._checked_at = monotonic()
+
+    async def aensure_fresh(self):
+        """Async ensure_fresh(): hops to a worker thread only when a check is due."""
+        if self.needs_check:
+            await sync_to_async(self.ensure_fresh)()
+
+    def _load(self):
+        cities = {city.name: city for city in City.objects.filter(is_active=True)}
+
+        schools_by_city = defaultdict(list)
+        schools_by_id = {}
+        for school in School.objects.filter(
+            is_active=True
+        ).select_related('city').order_by('-rating', '-trust_index', 'id'):  # SchoolSerializer, school_sort_key
+            schools_by_city[school.city_id].append(school)
+            schools_by_id[school.id] = school
+
+        instructors_by_city = defaultdict(list)
+        instructors_by_id = {}
+        for instructor in Instructor.objects.filter(
+            is_active=True
+        ).select_related('city').order_by('-rating', 'id'):  # InstructorSerializer, instructor_sort_key
+            instructors_by_city[(instructor.city_id, instructor.auto_type)].append(instructor)
+            instructors_by_id[instructor.id] = instructor
+
+        # Swap in complete structures so readers never see a partial catalog
+        self.cities = cities
+        self.schools_by_city = dict(schools_by_city)
+        self.schools_by_id = schools_by_id
+        self.instructors_by_city = dict(instructors_by_city)
+        self.instructors_by_id = instructors_by_id
+
+    # Lookups below read the current snapshot only; call ensure_fresh() first.
+
+    def get_city(self, city_name: str) -> Optional[City]:
+        return self.cities.get(city_name)
+
+    def get_cities(self) -> List[City]:
+        return sorted(self.cities.values(), key=lambda city: city.name)
+
+    def get_schools(self, city_name: Optional[str] = None) -> List[School]:
+        """Active schools in a city (or all), ordered by rating and trust index."""
+        if city_name is None:
+            schools = [school for schools in self.schools_by_city.values() for school in schools]
+            return sorted(schools, key=school_sort_key)
+        city = self.cities.get(city_name)
+        if not city:
+            return []
+        return list(self.schools_by_city.get(city.id, []))
+
+    def get_instructors(self, city_name: Optional[str] = None, auto_type: Optional[str] = None) -> List[Instructor]:
+        """Active instructors filtered by city and auto type, ordered by rating."""
+        city_id = None
+        if city_name is not None:
+            city = self.cities.get(city_name)
+            if not city:
+                return []
+            city_id = city.id
+        if city_id is not None and auto_type is not None:
+            return list(self.instructors_by_city.get((city_id, auto_type), []))
+        instructors = [
+            instructor
+            for (instructor_city_id, instructor_auto_type), instructors in self.instructors_by_city.items()
+            if (city_id is None or instructor_city_id == city_id)
+            and (auto_type is None or instructor_auto_type == auto_type)
+            for instructor in instructors
+        ]
+        return sorted(instructors, key=instructor_sort_key)
+
+    def get_schools_page(
+        self,
+        city_name: Optional[str],
+        cursor: Optional[str] = None,
+        backwards: bool = False,
+        limit: int = 10
+    ) -> Page:
+        """Keyset page of active schools in a city (or all)."""
+        if city_name is None:
+            schools = self.get_schools()
+        else:
+            city = self.cities.get(city_name)
+            schools = self.schools_by_city.get(city.id, []) if city else []
+        return keyset_page(schools, school_sort_key, SCHOOL_KEY_PARTS, cursor, backwards, limit)
+
+    def get_instructors_page(
+        self,
+        city_name: Optional[str],
+        auto_type: Optional[str],
+        cursor: Optional[str] = None,
+        backwards: bool = False,
+        limit: int = 10
+    ) -> Page:
+        """Keyset page of active instructors filtered by city and auto type."""
+        if city_name is None or auto_type is None:
+            instructors = self.get_instructors(city_name, auto_type)
+        else:
+            city = self.cities.get(city_name)
+            instructors = self.instructors_by_city.get((city.id, auto_type), []) if city else []
+        return keyset_page(instructors, instructor_sort_key, INSTRUCTOR_KEY_PARTS, cursor, backwards, limit)
+
+    def get_school(self, school_id: int) -> Optional[School]:
+        return self.schools_by_id.get(school_id)
+
+    def get_instructor(self, instructor_id: int) -> Optional[Instructor]:
+        return self.instructors_by_id.get(instructor_id)
+
+
+catalog = CatalogCache()
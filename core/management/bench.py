@@ -0,0 +1,33 @@
+"""
+Helpers shared by the bench_* management commands.
+"""
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import List, Sequence
+from django.db import connection
+
+
+@contextmanager
+def test_database(keepdb: bool = False):
+    """Run the block against a throwaway test database."""
+    old_name = connection.settings_dict['NAME']
+    if connection.vendor == 'sqlite' and not connection.settings_dict['TEST'].get('NAME'):
+        # In-memory SQLite fails concurrent writers with "table is locked";
+        # a file database makes them wait instead
+        connection.settings_dict['TEST']['NAME'] = os.path.join(tempfile.gettempdir(), 'avtomat_bench.sqlite3')
+        connection.settings_dict['OPTIONS'].setdefault('timeout', 60)
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=keepdb)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of values (0 for an empty sequence)."""
+    if not values:
+        return 0.0
+    ordered: List[float] = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
@@ -0,0 +1,115 @@
+"""
+Management command to benchmark API deployments under concurrent clients.
+"""
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter
+import aiohttp
+from django.core.management.base import BaseCommand, CommandError
+from core.management.bench import percentile
+
+# gunicorn arguments per deployment
+DEPLOYMENTS = {
+    'sync': ['core.wsgi:application'],
+    'asgi': ['core.asgi:application', '-k', 'uvicorn.workers.UvicornWorker'],
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Start each gunicorn deployment (sync WSGI workers vs ASGI workers) and load its read '
+        'endpoints with many concurrent clients. Reads the configured database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--deployments', default='sync,asgi', help='Comma-separated: ' + ', '.join(DEPLOYMENTS))
+        parser.add_argument('--workers', type=int, default=2, help='gunicorn worker processes')
+        parser.add_argument('--concurrency', type=int, default=200, help='Simultaneous clients')
+        parser.add_argument('--requests', type=int, default=5000, help='Requests per deployment')
+        parser.add_argument(
+            '--paths', default='/api/cities/,/api/schools/?city=Almaty,/api/instructors/?city=Almaty',
+            help='Comma-separated endpoints, requested round robin'
+        )
+        parser.add_argument(
+            '--db-check', action='store_true',
+            help='Check the catalog version on every request (one DB query each) instead of every few seconds'
+        )
+
+    def handle(self, *args, **options):
+        paths = options['paths'].split(',')
+        env = dict(os.environ)
+        if options['db_check']:
+            env['CATALOG_VERSION_CHECK_INTERVAL'] = '0'
+
+        for deployment in options['deployments'].split(','):
+            if deployment not in DEPLOYMENTS:
+                raise CommandError(f'Unknown deployment {deployment!r}')
+            port = self._free_port()
+            server = subprocess.Popen(
+                [
+                    sys.executable, '-m', 'gunicorn', *DEPLOYMENTS[deployment],
+                    '--bind', f'127.0.0.1:{port}', '--workers', str(options['workers']),
+                    '--log-level', 'warning'
+                ],
+                env=env
+            )
+            try:
+                self._wait_for_port(port, server)
+                elapsed, latencies, statuses = asyncio.run(
+                    self._load(f'http://127.0.0.1:{port}', paths, options['concurrency'], options['requests'])
+                )
+            finally:
+                server.terminate()
+                server.wait()
+
+            errors = sum(count for status, count in statuses.items() if status != 200)
+            self.stdout.write(
+                f'{deployment:>5}: {len(latencies) / elapsed:.0f} req/s, '
+                f'p50 {percentile(latencies, 50) * 1000:.1f}ms, '
+                f'p95 {percentile(latencies, 95) * 1000:.1f}ms, '
+                f'p99 {percentile(latencies, 99) * 1000:.1f}ms, '
+                f'{errors} errors {dict(statuses) if errors else ""}'
+            )
+
+    def _free_port(self) -> int:
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            return sock.getsockname()[1]
+
+    def _wait_for_port(self, port: int, server: subprocess.Popen, timeout: float = 30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(f'Server exited with code {server.returncode}')
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                return
+            except OSError:
+                time.sleep(0.2)
+        raise CommandError('Server did not start in time')
+
+    async def _load(self, base_url: str, paths, concurrency: int, requests: int):
+        latencies = []
+        statuses = Counter()
+        counter = iter(range(requests))
+
+        async def client(session: aiohttp.ClientSession):
+            for number in counter:
+                started = time.perf_counter()
+                try:
+                    async with session.get(base_url + paths[number % len(paths)]) as response:
+                        await response.read()
+                        statuses[response.status] += 1
+                except aiohttp.ClientError as e:
+                    statuses[type(e).__name__] += 1
+                latencies.append(time.perf_counter() - started)
+
+        connector = aiohttp.TCPConnector(limit=concurrency)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            started = time.perf_counter()
+            await asyncio.gather(*(client(session) for _ in range(concurrency)))
+            return time.perf_counter() - started, latencies, statuses
@@ -0,0 +1,82 @@
+"""
+Management command to benchmark bot services under concurrent users.
+"""
+import asyncio
+import time
+from django.core.management.base import BaseCommand
+from django.db.backends.signals import connection_created
+from core.models import City, School, User
+from core.management.bench import test_database, percentile
+
+
+class Command(BaseCommand):
+    help = 'Benchmark bot service throughput with many simultaneous simulated users (uses a test database)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200, help='Simultaneous simulated users')
+        parser.add_argument(
+            '--threads', default='0,8',
+            help='Comma-separated ORM pool sizes to compare (0 = thread-sensitive executor)'
+        )
+        parser.add_argument(
+            '--latency', type=float, default=2.0,
+            help='Simulated DB round-trip latency per query, ms'
+        )
+
+    def handle(self, *args, **options):
+        from bot.services.database import configure_db_executor
+
+        latency = options['latency'] / 1000
+
+        def add_latency(sender, connection, **kwargs):
+            def delayed(execute, sql, params, many, context):
+                time.sleep(latency)
+                return execute(sql, params, many, context)
+            connection.execute_wrappers.append(delayed)
+
+        with test_database():
+            self._seed()
+            connection_created.connect(add_latency)
+            try:
+                for round_number, threads in enumerate(int(t) for t in options['threads'].split(',')):
+                    configure_db_executor(threads)
+                    first_id = 1_000_000 * (round_number + 1)
+                    elapsed, latencies = asyncio.run(self._run(first_id, options['users']))
+                    label = f'{threads} threads' if threads else 'thread-sensitive'
+                    self.stdout.write(
+                        f'{label:>18}: {options["users"]} users in {elapsed:.2f}s, '
+                        f'{options["users"] / elapsed:.1f} users/s, '
+                        f'p50 {percentile(latencies, 50) * 1000:.0f}ms, '
+                        f'p95 {percentile(latencies, 95) * 1000:.0f}ms'
+                    )
+            finally:
+                connection_created.disconnect(add_latency)
+
+    def _seed(self):
+        city, _ = City.objects.get_or_create(name='Almaty', defaults={'name_ru': 'Алматы'})
+        for i in range(20):
+            user = User.objects.create_user(username=f'bench_school_{i}', role='school')
+            School.objects.create(user=user, name=f'Bench school {i}', city=city, address='-', rating=i % 5)
+
+    async def _run(self, first_id: int, users: int):
+        started = time.perf_counter()
+        latencies = await asyncio.gather(*(self._simulate_user(first_id + i) for i in range(users)))
+        return time.perf_counter() - started, latencies
+
+    async def _simulate_user(self, telegram_id: int) -> float:
+        from bot.services.application_service import get_or_create_user, create_school_application
+        from bot.services.school_service import get_schools_by_city
+
+        started = time.perf_counter()
+        await get_or_create_user(telegram_id)
+        schools = await get_schools_by_city('Almaty')
+        await create_school_application(
+            telegram_id=telegram_id,
+            name='Bench',
+            phone='+77000000000',
+            city='Almaty',
+            category='B',
+            format_type='Онлайн',
+            school_id=schools[0].id
+        )
+        return time.perf_counter() - started
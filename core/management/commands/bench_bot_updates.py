@@ -0,0 +1,211 @@
+"""
+Management command to load-test the bot by replaying synthetic updates.
+
+Virtual users walk through the full school and instructor flows; updates go
+through the real Dispatcher, routers and middlewares, with the Bot API
+replaced by an in-process fake session.
+"""
+import asyncio
+import itertools
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import AsyncGenerator, Dict, List, Tuple
+from django.core.management.base import BaseCommand
+from django.db.backends.signals import connection_created
+from aiogram import Bot
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import SendMessage
+from aiogram.types import Chat, Message, Update
+from core.models import Application, City, Instructor, School, User
+from core.management.bench import test_database, percentile
+
+# (step name, update kind, payload); '{school}' / '{instructor}' are replaced with ids
+SCHOOL_FLOW = [
+    ('start', 'message', '/start'),
+    ('flow', 'callback', 'flow_school'),
+    ('city', 'callback', 'city_Almaty'),
+    ('category', 'callback', 'category_B'),
+    ('format', 'callback', 'format_online'),
+    ('pick', 'callback', 'school_{school}'),
+    ('name', 'message', 'Bench'),
+    ('phone', 'message', '+77001234567'),
+]
+INSTRUCTOR_FLOW = [
+    ('start', 'message', '/start'),
+    ('flow', 'callback', 'flow_instructor'),
+    ('city', 'callback', 'city_Almaty'),
+    ('auto_type', 'callback', 'auto_automatic'),
+    ('pick', 'callback', 'instructor_{instructor}'),
+    ('time', 'message', 'любое'),
+    ('name', 'message', 'Bench'),
+    ('phone', 'message', '+77001234567'),
+]
+
+
+class FakeTelegramSession(BaseSession):
+    """Bot API session that answers in-process and records every call."""
+
+    def __init__(self, latency: float = 0.0):
+        super().__init__()
+        self.latency = latency
+        self.calls: Counter = Counter()
+        self._message_ids = itertools.count(1)
+
+    async def make_request(self, bot, method, timeout=None):
+        self.calls[type(method).__name__] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if isinstance(method, SendMessage):
+            return Message(
+                message_id=next(self._message_ids),
+                date=datetime.now(),
+                chat=Chat(id=method.chat_id, type='private'),
+                text=method.text
+            )
+        return True
+
+    async def stream_content(self, url, headers=None, timeout=30, chunk_size=65536,
+                             raise_for_status=True) -> AsyncGenerator[bytes, None]:
+        yield b''
+
+    async def close(self):
+        pass
+
+
+class Command(BaseCommand):
+    help = 'Load-test the bot: replay school and instructor flows through the Dispatcher (uses a test database)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100, help='Concurrent virtual users (half per flow)')
+        parser.add_argument('--think-time', type=float, default=0.0, help='Pause between a user\'s steps, ms')
+        parser.add_argument('--api-latency', type=float, default=0.0, help='Simulated Bot API latency, ms')
+        parser.add_argument('--db-latency', type=float, default=0.0, help='Simulated DB round-trip per query, ms')
+        parser.add_argument('--throttle', action='store_true', help='Keep production per-user throttling')
+
+    def handle(self, *args, **options):
+        db_latency = options['db_latency'] / 1000
+
+        def add_latency(sender, connection, **kwargs):
+            def delayed(execute, sql, params, many, context):
+                time.sleep(db_latency)
+                return execute(sql, params, many, context)
+            connection.execute_wrappers.append(delayed)
+
+        with test_database():
+            school_id, instructor_id = self._seed()
+            if db_latency:
+                connection_created.connect(add_latency)
+            try:
+                asyncio.run(self._run(options, school_id, instructor_id))
+            finally:
+                connection_created.disconnect(add_latency)
+
+    def _seed(self) -> Tuple[int, int]:
+        city, _ = City.objects.get_or_create(name='Almaty', defaults={'name_ru': 'Алматы'})
+        schools, instructors = [], []
+        for i in range(20):
+            user = User.objects.create_user(username=f'bench_school_{i}', role='school')
+            schools.append(School.objects.create(
+                user=user, name=f'Bench school {i}', city=city, address='-', rating=i % 5
+            ))
+            user = User.objects.create_user(username=f'bench_instructor_{i}', role='instructor')
+            instructors.append(Instructor.objects.create(
+                user=user, name=f'Bench instructor {i}', city=city, auto_type='automatic',
+                phone='+77000000000', rating=i % 5
+            ))
+        return schools[0].id, instructors[0].id
+
+    async def _run(self, options, school_id: int, instructor_id: int):
+        from bot.dispatcher import create_dispatcher
+        from bot.middlewares.throttling import PreAnsweredMiddleware
+        from bot.services.metrics import UPDATE_DB_QUERIES, UPDATE_DB_DURATION
+        from bot.services.outbox import get_outbox
+        from bot.services.pickers import warm_up
+        from bot.services.telegram_client import set_bot
+
+        session = FakeTelegramSession(latency=options['api_latency'] / 1000)
+        session.middleware(PreAnsweredMiddleware())
+        bot = Bot(token='42:BENCH', session=session)
+        set_bot(bot)
+        dp = create_dispatcher()
+        if not options['throttle']:
+            dp['throttling'].rate = dp['throttling'].burst = 1_000_000
+        await warm_up()
+
+        queries_before = sum(UPDATE_DB_QUERIES.values.values())
+        db_seconds_before = sum(entry[1] for entry in UPDATE_DB_DURATION.values.values())
+
+        update_ids = itertools.count(1)
+        latencies: Dict[str, List[float]] = defaultdict(list)
+        think_time = options['think_time'] / 1000
+        users = options['users']
+
+        async def virtual_user(index: int):
+            telegram_id = 5_000_000 + index
+            flow = SCHOOL_FLOW if index % 2 == 0 else INSTRUCTOR_FLOW
+            for step, kind, payload in flow:
+                payload = payload.format(school=school_id, instructor=instructor_id)
+                update = self._make_update(bot, next(update_ids), telegram_id, kind, payload)
+                started = time.perf_counter()
+                await dp.feed_update(bot, update)
+                latencies[step].append(time.perf_counter() - started)
+                if think_time:
+                    await asyncio.sleep(think_time)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(virtual_user(i) for i in range(users)))
+        elapsed = time.perf_counter() - started
+
+        drain_started = time.perf_counter()
+        await get_outbox(bot).join()
+        await dp.emit_shutdown(bot=bot, dispatcher=dp)
+        drain = time.perf_counter() - drain_started
+
+        updates = sum(len(values) for values in latencies.values())
+        queries = sum(UPDATE_DB_QUERIES.values.values()) - queries_before
+        db_seconds = sum(entry[1] for entry in UPDATE_DB_DURATION.values.values()) - db_seconds_before
+        all_latencies = [value for values in latencies.values() for value in values]
+        applications = await Application.objects.acount()
+
+        self.stdout.write(
+            f'{users} users, {updates} updates in {elapsed:.2f}s: {updates / elapsed:.1f} updates/s, '
+            f'drain {drain:.2f}s'
+        )
+        self.stdout.write(
+            f'latency p50 {percentile(all_latencies, 50) * 1000:.1f}ms, '
+            f'p95 {percentile(all_latencies, 95) * 1000:.1f}ms, '
+            f'p99 {percentile(all_latencies, 99) * 1000:.1f}ms'
+        )
+        self.stdout.write(
+            f'DB: {queries / updates:.1f} queries/update, {db_seconds / updates * 1000:.2f}ms/update'
+        )
+        for step, values in latencies.items():
+            self.stdout.write(
+                f'  {step:>10}: p50 {percentile(values, 50) * 1000:7.1f}ms  '
+                f'p95 {percentile(values, 95) * 1000:7.1f}ms  p99 {percentile(values, 99) * 1000:7.1f}ms'
+            )
+        self.stdout.write(f'Bot API calls: {dict(session.calls)}')
+        self.stdout.write(f'Throttling: {dp["throttling"].counters}')
+        if applications != users:
+            self.stderr.write(f'Expected {users} applications, got {applications}')
+
+    def _make_update(self, bot: Bot, update_id: int, telegram_id: int, kind: str, payload: str) -> Update:
+        user = {'id': telegram_id, 'is_bot': False, 'first_name': 'Bench'}
+        message = {
+            'message_id': update_id,
+            'date': int(time.time()),
+            'chat': {'id': telegram_id, 'type': 'private'},
+            'from': user,
+            'text': payload,
+        }
+        if kind == 'message':
+            if payload.startswith('/'):
+                message['entities'] = [{'type': 'bot_command', 'offset': 0, 'length': len(payload)}]
+            data = {'update_id': update_id, 'message': message}
+        else:
+            data = {'update_id': update_id, 'callback_query': {
+                'id': str(update_id), 'from': user, 'chat_instance': str(telegram_id),
+                'data': payload, 'message': message,
+            }}
+        return Update.model_validate(data, context={'bot': bot})
@@ -0,0 +1,161 @@
+"""
+Management command to benchmark database connection reuse.
+"""
+import asyncio
+import io
+import logging
+import time
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.backends.signals import connection_created
+from core.management.bench import test_database, percentile
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare connection setup overhead per web request (WSGI and ASGI handlers) and per '
+        'bot ORM call with and without persistent connections (uses a test database)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500, help='Web requests / bot ORM calls per round')
+        parser.add_argument(
+            '--max-age', default='0,60',
+            help='Comma-separated CONN_MAX_AGE values to compare (0 = reconnect every request)'
+        )
+        parser.add_argument(
+            '--connect-latency', type=float, default=5.0,
+            help='Simulated connection setup cost (TCP, TLS, auth), ms'
+        )
+        parser.add_argument('--path', default='/api/applications/1/', help='Web endpoint to request')
+        parser.add_argument(
+            '--handlers', default='wsgi,asgi',
+            help='Comma-separated web handlers to drive: wsgi (gunicorn sync workers), asgi (uvicorn workers)'
+        )
+
+    def handle(self, *args, **options):
+        latency = options['connect_latency'] / 1000
+        opened = []
+
+        def on_connect(sender, connection, **kwargs):
+            opened.append(connection)
+            time.sleep(latency)
+
+        with test_database():
+            connection_created.connect(on_connect)
+            try:
+                for max_age in (int(value) for value in options['max_age'].split(',')):
+                    connection.close()
+                    connection.settings_dict['CONN_MAX_AGE'] = max_age
+                    label = f'CONN_MAX_AGE={max_age}'
+
+                    for handler in options['handlers'].split(','):
+                        opened.clear()
+                        if handler == 'asgi':
+                            elapsed, timings = asyncio.run(self._run_asgi(options['path'], options['requests']))
+                        else:
+                            elapsed, timings = self._run_web(options['path'], options['requests'])
+                        self._report(f'{handler} {label}', options['requests'], elapsed, timings, opened)
+
+                    opened.clear()
+                    elapsed, timings = asyncio.run(self._run_bot(options['requests']))
+                    self._report(f'bot {label}', options['requests'], elapsed, timings, opened)
+            finally:
+                connection_created.disconnect(on_connect)
+
+    def _report(self, label: str, requests: int, elapsed: float, timings, opened: list):
+        # Connections left open by threads that are gone are never reused nor closed
+        still_open = len({id(wrapper) for wrapper in opened if wrapper.connection is not None})
+        self.stdout.write(
+            f'{label:>23}: {requests / elapsed:.0f} req/s, '
+            f'p50 {percentile(timings, 50) * 1000:.2f}ms, '
+            f'p95 {percentile(timings, 95) * 1000:.2f}ms, '
+            f'{len(opened)} connections opened ({len(opened) / requests:.2f} per request), '
+            f'{still_open} still open'
+        )
+
+    def _run_web(self, path: str, requests: int):
+        # Call the WSGI handler like gunicorn does: the test client would skip
+        # the request_started/request_finished connection handling
+        handler = WSGIHandler()
+        timings = []
+        request_logger = logging.getLogger('django.request')
+        level = request_logger.level
+        request_logger.setLevel(logging.ERROR)  # The default path answers 404
+        started = time.perf_counter()
+        try:
+            for _ in range(requests):
+                request_started = time.perf_counter()
+                response = handler(self._environ(path), lambda status, headers: None)
+                b''.join(response)
+                response.close()
+                timings.append(time.perf_counter() - request_started)
+        finally:
+            request_logger.setLevel(level)
+        return time.perf_counter() - started, timings
+
+    async def _run_asgi(self, path: str, requests: int):
+        # Like uvicorn: every request gets its own thread for sync code
+        handler = ASGIHandler()
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+            'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': b'',
+            'headers': [(b'host', b'localhost'), (b'authorization', self._authorization().encode())], 'server': ('localhost', 80), 'client': ('127.0.0.1', 0),
+        }
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            pass
+
+        timings = []
+        request_logger = logging.getLogger('django.request')
+        level = request_logger.level
+        request_logger.setLevel(logging.ERROR)
+        started = time.perf_counter()
+        try:
+            for _ in range(requests):
+                request_started = time.perf_counter()
+                await handler(dict(scope), receive, send)
+                timings.append(time.perf_counter() - request_started)
+        finally:
+            request_logger.setLevel(level)
+        return time.perf_counter() - started, timings
+
+    def _authorization(self) -> str:
+        # Verified without a query, so only the view's own queries open connections
+        from api.authentication import TokenUser, issue_token
+        return f'Bearer {issue_token(TokenUser(id=1, telegram_id=1, role="student"))}'
+
+    def _environ(self, path: str) -> dict:
+        return {
+            'REQUEST_METHOD': 'GET',
+            'PATH_INFO': path,
+            'QUERY_STRING': '',
+            'SERVER_NAME': 'localhost',
+            'SERVER_PORT': '80',
+            'HTTP_HOST': 'localhost',
+            'HTTP_AUTHORIZATION': self._authorization(),
+            'wsgi.input': io.BytesIO(),
+            'wsgi.errors': io.StringIO(),
+            'wsgi.url_scheme': 'http',
+        }
+
+    async def _run_bot(self, calls: int):
+        from bot.services.database import Application, db_sync_to_async
+
+        @db_sync_to_async
+        def query():
+            return Application.objects.filter(pk=1).exists()
+
+        async def timed() -> float:
+            call_started = time.perf_counter()
+            await query()
+            return time.perf_counter() - call_started
+
+        started = time.perf_counter()
+        timings = await asyncio.gather(*(timed() for _ in range(calls)))
+        return time.perf_counter() - started, timings
@@ -0,0 +1,90 @@
+"""
+Management command to benchmark API serialization and JSON rendering.
+"""
+import time
+from typing import Callable
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from core.management.bench import test_database, percentile
+from core.models import User, City, School
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare SchoolSerializer + JSONRenderer with SchoolValuesSerializer + FastJSONRenderer '
+        'on a list of schools (uses a test database)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--schools', type=int, default=1000, help='Schools to serialize')
+        parser.add_argument('--repeat', type=int, default=30, help='Timed runs per variant')
+
+    def handle(self, *args, **options):
+        from api.renderers import FastJSONRenderer
+        from api.serializers import SchoolSerializer, SchoolValuesSerializer
+
+        drf_renderer, fast_renderer = JSONRenderer(), FastJSONRenderer()
+        with test_database():
+            self._seed(options['schools'])
+            queryset = School.objects.filter(is_active=True).order_by('-rating', '-trust_index', 'id')
+            schools = list(queryset.select_related('city'))
+
+            variants = [
+                # Catalog endpoints: instances already in memory (core.catalog)
+                ('instances: SchoolSerializer + JSONRenderer',
+                 lambda: drf_renderer.render(SchoolSerializer(schools, many=True).data)),
+                ('instances: SchoolValuesSerializer + orjson',
+                 lambda: fast_renderer.render(SchoolValuesSerializer(schools, many=True).data)),
+                # Straight from the database
+                ('queryset: select_related + SchoolSerializer + JSONRenderer',
+                 lambda: drf_renderer.render(SchoolSerializer(queryset.select_related('city'), many=True).data)),
+                ('queryset: values_list + SchoolValuesSerializer + orjson',
+                 lambda: fast_renderer.render(SchoolValuesSerializer.from_queryset(queryset))),
+            ]
+
+            expected = variants[0][1]()
+            for label, render in variants:
+                if render() != expected:
+                    raise CommandError(f'{label}: output differs from SchoolSerializer + JSONRenderer')
+                timings = self._time(render, options['repeat'])
+                self.stdout.write(
+                    f'{label:<60} p50 {percentile(timings, 50) * 1000:.2f}ms, '
+                    f'p95 {percentile(timings, 95) * 1000:.2f}ms'
+                )
+            self.stdout.write(f'{len(schools)} schools, {len(expected)} bytes, identical output')
+
+            # Error responses carry ErrorDetail strings inside ReturnDict / lists
+            for label, payload in self._error_payloads():
+                if fast_renderer.render(payload) != drf_renderer.render(payload):
+                    raise CommandError(f'{label}: error output differs from JSONRenderer')
+            self.stdout.write('Error payloads: identical output')
+
+    def _error_payloads(self):
+        from rest_framework import exceptions
+        from api.serializers import ApplicationCreateSerializer
+
+        serializer = ApplicationCreateSerializer(data={'school': 'x', 'student_phone': '1' * 50})
+        serializer.is_valid()
+        yield 'validation errors', serializer.errors
+        for error in (exceptions.NotFound('Invalid cursor'), exceptions.AuthenticationFailed('Invalid or expired token.')):
+            yield type(error).__name__, {'detail': error.detail}
+
+    def _time(self, render: Callable, repeat: int):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            render()
+            timings.append(time.perf_counter() - started)
+        return timings
+
+    def _seed(self, count: int):
+        city = City.objects.create(name='Almaty', name_ru='Алматы')
+        users = User.objects.bulk_create(User(username=f'bench_school_{number}', role='school') for number in range(count))
+        School.objects.bulk_create(
+            School(
+                user=user, name=f'Автошкола «Старт» {number}', city=city, address=f'пр. Абая, {number}',
+                rating=number % 500 / 100, trust_index=50 + number % 50, whatsapp='+77000000000',
+                payment_link_kaspi='https://kaspi.kz/pay/avtomat'
+            )
+            for number, user in enumerate(users)
+        )
@@ -0,0 +1,124 @@
+"""
+Management command to check the number of SQL queries per API endpoint.
+"""
+import hashlib
+import hmac
+import json
+import time
+from urllib.parse import urlencode
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from api.authentication import issue_token
+from core.catalog import bump_catalog_version, catalog
+from core.management.bench import test_database
+from core.models import User, City, School, Instructor, Application
+
+# Queries allowed per request, whatever the number of rows returned (bootstrap:
+# user lookup, open applications and the catalog). Catalog
+# endpoints are measured right after a catalog change: version check plus a
+# full reload (cities, schools, instructors)
+BUDGETS = {
+    '/api/cities/': 4,
+    '/api/schools/': 4,
+    '/api/schools/?city={city}': 4,
+    '/api/instructors/?city={city}&auto_type=manual': 4,
+    '/api/instructors/?limit=100': 4,
+    '/api/applications/{application}/': 1,
+    '/api/bootstrap/?city={city}': 6,
+}
+
+TELEGRAM_ID = 700000001
+
+
+class Command(BaseCommand):
+    help = (
+        'Request each API endpoint with small and large data sets (uses a test database) and '
+        'fail if an endpoint exceeds its query budget or its query count grows with the rows returned'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='3,200', help='Comma-separated numbers of rows per model to seed')
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',')]
+        counts = {path: [] for path in BUDGETS}
+
+        with test_database(), override_settings(ALLOWED_HOSTS=['testserver']):
+            client = Client()
+            for size in sizes:
+                context = self._seed(size)
+                for path in BUDGETS:
+                    counts[path].append(self._count(client, path.format(**context), context['authorization']))
+
+        failures = []
+        for path, budget in BUDGETS.items():
+            line = f'{path:<50} ' + ' '.join(
+                f'{size} rows: {count}' for size, count in zip(sizes, counts[path])
+            ) + f' (budget {budget})'
+            if max(counts[path]) > budget or len(set(counts[path])) > 1:
+                failures.append(path)
+                self.stdout.write(self.style.ERROR(line))
+            else:
+                self.stdout.write(line)
+
+        if failures:
+            raise CommandError(f'Query budget exceeded: {", ".join(failures)}')
+        self.stdout.write(self.style.SUCCESS('All endpoints within query budget'))
+
+    def _count(self, client: Client, path: str, authorization: dict) -> int:
+        # Cold catalog: the reload must not depend on the number of rows either
+        catalog.version = None
+        # Bootstrap takes initData; the other endpoints the token it returns
+        header = authorization['initData' if path.startswith('/api/bootstrap/') else 'token']
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(path, headers={'Authorization': header})
+        if response.status_code != 200:
+            raise CommandError(f'{path} answered {response.status_code}: {response.content[:200]!r}')
+        return len(queries)
+
+    def _seed(self, size: int) -> dict:
+        """Replace the data with `size` schools, instructors and applications in one city."""
+        Application.objects.all().delete()
+        School.objects.all().delete()
+        Instructor.objects.all().delete()
+        User.objects.all().delete()
+        City.objects.all().delete()
+
+        city = City.objects.create(name='Almaty', name_ru='Алматы')
+        users = User.objects.bulk_create(
+            User(username=f'budget_{number}', role='school' if number < size else 'instructor')
+            for number in range(size * 2)
+        )
+        schools = School.objects.bulk_create(
+            School(user=user, name=f'Школа {number}', city=city, address='ул. Абая, 1', rating=number % 5)
+            for number, user in enumerate(users[:size])
+        )
+        instructors = Instructor.objects.bulk_create(
+            Instructor(user=user, name=f'Инструктор {number}', city=city, auto_type='manual', phone='+77000000000')
+            for number, user in enumerate(users[size:])
+        )
+        student = User.objects.create(
+            username='budget_student', first_name='Студент', telegram_id=TELEGRAM_ID, city=city.name
+        )
+        applications = Application.objects.bulk_create(
+            Application(
+                student=student, city=city, student_name='Студент', student_phone='+77000000000',
+                **({'school': schools[number]} if number % 2 else {'instructor': instructors[number]})
+            )
+            for number in range(size)
+        )
+        bump_catalog_version()
+        authorization = {'initData': f'tma {self._init_data()}', 'token': f'Bearer {issue_token(student)}'}
+        return {'city': city.name, 'application': applications[-1].id, 'authorization': authorization}
+
+    def _init_data(self) -> str:
+        """initData signed like Telegram does for the seeded student."""
+        from api.telegram_auth import _secret_key
+        from bot.config import TELEGRAM_BOT_TOKEN
+
+        data = {'auth_date': str(int(time.time())), 'user': json.dumps({'id': TELEGRAM_ID, 'first_name': 'Студент'})}
+        check_string = '\n'.join(f'{key}={value}' for key, value in sorted(data.items()))
+        data['hash'] = hmac.new(_secret_key(TELEGRAM_BOT_TOKEN), check_string.encode(), hashlib.sha256).hexdigest()
+        return urlencode(data)
@@ -0,0 +1,20 @@
+"""
+Management command to rebuild discipline index aggregates from event history.
+"""
+from django.core.management.base import BaseCommand
+from core.models import User
+from crm.analytics.services import rebuild_discipline_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild running discipline index aggregates from analytics events (run after migrating)'
+
+    def handle(self, *args, **options):
+        users = User.objects.filter(analytics_events__isnull=False).distinct()
+        
+        rebuilt_count = 0
+        for user in users.iterator():
+            if rebuild_discipline_index(user):
+                rebuilt_count += 1
+        
+        self.stdout.write(self.style.SUCCESS(f'Discipline indices rebuilt: {rebuilt_count}'))
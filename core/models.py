@@ -103,6 +103,7 @@ class Application(models.Model):
         ('completed', 'Завершено'),
         ('cancelled', 'Отменено'),
     ]
+    OPEN_STATUSES = ('new', 'confirmed', 'paid')
     
     CATEGORY_CHOICES = [
         ('A', 'A'),
@@ -156,3 +157,50 @@ class Application(models.Model):
                 self.status_changed_at = timezone.now()
         super().save(*args, **kwargs)
 
+
+
+class BotState(models.Model):
+    """Persistent aiogram FSM state shared by bot workers."""
+    key = models.CharField(max_length=255, unique=True)
+    state = models.CharField(max_length=255, blank=True, null=True)
+    data = models.TextField(blank=True, default='')  # Compact JSON
+    expires_at = models.DateTimeField(db_index=True)
+    
+    class Meta:
+        verbose_name = 'Состояние бота'
+        verbose_name_plural = 'Состояния бота'
+    
+    def __str__(self):
+        return f"{self.key}: {self.state}"
+
+
+class DeadLetter(models.Model):
+    """Outbound bot message that could not be delivered."""
+    chat_id = models.BigIntegerField(db_index=True)
+    payload = models.JSONField(default=dict)  # text, parse_mode, reply_markup
+    priority = models.IntegerField(default=0)
+    attempts = models.IntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    replayed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        verbose_name = 'Недоставленное сообщение'
+        verbose_name_plural = 'Недоставленные сообщения'
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"Сообщение для {self.chat_id} ({self.created_at})"
+
+
+class CatalogVersion(models.Model):
+    """Version stamp of the city/school/instructor catalog, bumped on every change."""
+    version = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Версия каталога'
+        verbose_name_plural = 'Версии каталога'
+    
+    def __str__(self):
+        return f"Каталог v{self.version}"
@@ -100,6 +100,19 @@ else:
         }
     }
 
+# Keep connections open between requests (and bot ORM calls) for this many
+# seconds instead of reconnecting each time; 0 closes them after each request.
+# Under ASGI (core/asgi.py sets DJANGO_ASGI) each request runs its sync ORM code
+# in a thread of its own, so a persistent connection is never reused nor closed:
+# DB_ASGI_CONN_MAX_AGE applies there instead and should stay 0 unless a pooler
+# (e.g. PgBouncer) owns the connections.
+# Health checks catch connections dropped by the server before reusing them.
+if env.bool('DJANGO_ASGI', default=False):
+    DATABASES['default']['CONN_MAX_AGE'] = env.int('DB_ASGI_CONN_MAX_AGE', default=0)
+else:
+    DATABASES['default']['CONN_MAX_AGE'] = env.int('DB_CONN_MAX_AGE', default=60)
+DATABASES['default']['CONN_HEALTH_CHECKS'] = env.bool('DB_CONN_HEALTH_CHECKS', default=True)
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -138,6 +151,23 @@ AUTH_USER_MODEL = 'core.User'
 # Telegram Bot Token
 TELEGRAM_BOT_TOKEN = env('TELEGRAM_BOT_TOKEN', default='')
 
+# Mini App initData older than this (seconds, by auth_date) is rejected; 0 disables the check
+TELEGRAM_INIT_DATA_MAX_AGE = env.int('TELEGRAM_INIT_DATA_MAX_AGE', default=86400)
+
+# Lifetime (seconds) of API tokens issued by /api/auth/telegram/
+API_TOKEN_TTL = env.int('API_TOKEN_TTL', default=86400)
+
+# Catalog cache: how often (seconds) to check the DB version stamp for changes
+# made by other processes
+CATALOG_VERSION_CHECK_INTERVAL = env.float('CATALOG_VERSION_CHECK_INTERVAL', default=5.0)
+
+# Cache-Control max-age (seconds) of catalog API responses; proxies and
+# browsers may serve them this long before revalidating with the ETag
+API_CACHE_MAX_AGE = env.int('API_CACHE_MAX_AGE', default=5)
+
+# Largest ?limit= accepted by the cursor-paginated schools and instructors lists
+API_MAX_PAGE_SIZE = env.int('API_MAX_PAGE_SIZE', default=100)
+
 # CORS settings
 CORS_ALLOWED_ORIGINS = [
     "https://web.telegram.org",
@@ -154,7 +184,13 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
+        'api.authentication.TelegramTokenAuthentication',
+        'api.authentication.TelegramInitDataAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
@@ -0,0 +1,20 @@
+"""
+Signal handlers for core models.
+"""
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from core.models import City, School, Instructor
+from core.catalog import bump_catalog_version, catalog
+
+
+@receiver(post_save, sender=City)
+@receiver(post_delete, sender=City)
+@receiver(post_save, sender=School)
+@receiver(post_delete, sender=School)
+@receiver(post_save, sender=Instructor)
+@receiver(post_delete, sender=Instructor)
+def catalog_changed(sender, **kwargs):
+    """Invalidate catalog caches in this and other processes."""
+    bump_catalog_version()
+    transaction.on_commit(catalog.invalidate)
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='disciplineindex',
+            name='reaction_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='disciplineindex',
+            name='reaction_delay_sum',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='disciplineindex',
+            name='step_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='disciplineindex',
+            name='step_time_sum',
+            field=models.FloatField(default=0.0),
+        ),
+    ]
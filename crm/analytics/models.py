@@ -2,6 +2,7 @@
 Analytics models for tracking user behavior and trust indices.
 """
 from django.db import models
+from django.utils import timezone
 from core.models import User, School
 
 
@@ -17,7 +18,7 @@ class AnalyticsEvent(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='analytics_events')
     event_type = models.CharField(max_length=50, choices=EVENT_TYPES)
     event_data = models.JSONField(default=dict, blank=True)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    timestamp = models.DateTimeField(default=timezone.now)  # Set when tracked, not when flushed
     step_name = models.CharField(max_length=100, blank=True)
     time_since_last = models.FloatField(null=True, blank=True)  # Seconds
     
@@ -39,6 +40,11 @@ class DisciplineIndex(models.Model):
     total_clicks = models.IntegerField(default=0)
     index_value = models.DecimalField(max_digits=5, decimal_places=2, default=100.00)
     last_calculated = models.DateTimeField(auto_now=True)
+    # Running aggregates, updated per event (see crm.analytics.services)
+    step_time_sum = models.FloatField(default=0.0)
+    step_count = models.IntegerField(default=0)
+    reaction_delay_sum = models.FloatField(default=0.0)
+    reaction_count = models.IntegerField(default=0)
     
     class Meta:
         verbose_name = 'Индекс дисциплины'
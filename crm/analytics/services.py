@@ -2,9 +2,12 @@
 Services for calculating trust and discipline indices.
 """
 from datetime import timedelta
+from typing import Iterable, Optional, Tuple
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
 from django.utils import timezone
-from core.models import School, Application
-from crm.analytics.models import TrustIndex, DisciplineIndex
+from core.models import School, Application, User
+from crm.analytics.models import AnalyticsEvent, TrustIndex, DisciplineIndex
 
 
 def calculate_trust_index(school: School) -> TrustIndex:
@@ -109,3 +112,105 @@ def update_all_trust_indices():
     for school in schools:
         calculate_trust_index(school)
 
+
+
+def calculate_discipline_index_value(average_step_time: float, return_count: int, reaction_delay: float) -> float:
+    """Discipline index formula (simplified for MVP). Higher is better (100 = perfect)."""
+    index = 100.0
+    if average_step_time > 300:  # More than 5 minutes between steps
+        index -= 10
+    if return_count > 3:
+        index -= 5 * return_count
+    if reaction_delay > 60:  # More than 1 minute reaction
+        index -= 5
+    return max(0, min(100, index))
+
+
+def _refresh_discipline_averages(discipline_index: DisciplineIndex):
+    """Derive averages and index value from the running aggregates."""
+    discipline_index.average_step_time = (
+        discipline_index.step_time_sum / discipline_index.step_count
+        if discipline_index.step_count else 0
+    )
+    discipline_index.reaction_delay = (
+        discipline_index.reaction_delay_sum / discipline_index.reaction_count
+        if discipline_index.reaction_count else 0
+    )
+    discipline_index.index_value = calculate_discipline_index_value(
+        discipline_index.average_step_time,
+        discipline_index.return_count,
+        discipline_index.reaction_delay
+    )
+
+
+def apply_events_to_discipline_index(user: User, events: Iterable[Tuple[str, Optional[float]]]):
+    """Update user's discipline index for new (event_type, time_since_last) events in O(len(events))."""
+    step_time_sum = reaction_delay_sum = 0.0
+    step_count = reaction_count = return_count = total_clicks = 0
+    for event_type, time_since_last in events:
+        # Events without a time (None or 0) are not counted in averages
+        if time_since_last:
+            step_time_sum += time_since_last
+            step_count += 1
+        if event_type == 'return':
+            return_count += 1
+        if event_type == 'button_click':
+            total_clicks += 1
+            if time_since_last:
+                reaction_delay_sum += time_since_last
+                reaction_count += 1
+    
+    updates = {}
+    if step_count:
+        updates['step_time_sum'] = F('step_time_sum') + step_time_sum
+        updates['step_count'] = F('step_count') + step_count
+    if return_count:
+        updates['return_count'] = F('return_count') + return_count
+    if total_clicks:
+        updates['total_clicks'] = F('total_clicks') + total_clicks
+    if reaction_count:
+        updates['reaction_delay_sum'] = F('reaction_delay_sum') + reaction_delay_sum
+        updates['reaction_count'] = F('reaction_count') + reaction_count
+    
+    updates['last_calculated'] = timezone.now()
+    
+    with transaction.atomic():
+        # Write first: the row (SQLite: the database) stays locked until commit, so
+        # concurrent events serialize here instead of failing a read-to-write upgrade
+        if not DisciplineIndex.objects.filter(user=user).update(**updates):
+            DisciplineIndex.objects.get_or_create(user=user)
+            DisciplineIndex.objects.filter(user=user).update(**updates)
+        discipline_index = DisciplineIndex.objects.get(user=user)
+        _refresh_discipline_averages(discipline_index)
+        discipline_index.save(update_fields=[
+            'average_step_time', 'reaction_delay', 'index_value', 'last_calculated'
+        ])
+    return discipline_index
+
+
+def rebuild_discipline_index(user: User) -> Optional[DisciplineIndex]:
+    """Recalculate user's discipline index aggregates from the full event history."""
+    timed = Q(time_since_last__isnull=False) & ~Q(time_since_last=0)
+    clicks = Q(event_type='button_click')
+    totals = AnalyticsEvent.objects.filter(user=user).aggregate(
+        events=Count('id'),
+        step_time_sum=Sum('time_since_last', filter=timed),
+        step_count=Count('id', filter=timed),
+        return_count=Count('id', filter=Q(event_type='return')),
+        total_clicks=Count('id', filter=clicks),
+        reaction_delay_sum=Sum('time_since_last', filter=clicks & timed),
+        reaction_count=Count('id', filter=clicks & timed),
+    )
+    if not totals['events']:
+        return None
+    
+    discipline_index, created = DisciplineIndex.objects.get_or_create(user=user)
+    discipline_index.step_time_sum = totals['step_time_sum'] or 0.0
+    discipline_index.step_count = totals['step_count']
+    discipline_index.return_count = totals['return_count']
+    discipline_index.total_clicks = totals['total_clicks']
+    discipline_index.reaction_delay_sum = totals['reaction_delay_sum'] or 0.0
+    discipline_index.reaction_count = totals['reaction_count']
+    _refresh_discipline_averages(discipline_index)
+    discipline_index.save()
+    return discipline_index
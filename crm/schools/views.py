@@ -8,7 +8,7 @@ from django.contrib import messages
 from django.http import JsonResponse
 from core.models import School, Application
 from bot.services.messaging import send_auto_response
-import asyncio
+from bot.services.telegram_client import run_sync
 
 
 def login_view(request):
@@ -102,11 +102,15 @@ def update_status(request, pk):
 def send_response(request, pk):
     """Send auto-response to student."""
     school = request.user.school_profile
-    application = get_object_or_404(Application, pk=pk, school=school)
+    # Load relations up front: the async sender must not hit the DB lazily
+    application = get_object_or_404(
+        Application.objects.select_related('student', 'school__user', 'instructor', 'city'),
+        pk=pk, school=school
+    )
     
     try:
-        # Run async function in sync context
-        asyncio.run(send_auto_response(application))
+        # Run on the shared bot loop instead of a fresh event loop per click
+        run_sync(send_auto_response(application))
         messages.success(request, 'Автоответ отправлен студенту.')
     except Exception as e:
         messages.error(request, f'Ошибка при отправке: {str(e)}')
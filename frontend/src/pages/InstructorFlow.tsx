@@ -1,7 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { useTelegram } from '../hooks/useTelegram';
 import api from '../services/api';
-import type { City, Instructor } from '../types';
+import type { Bootstrap, City, Instructor } from '../types';
 import './InstructorFlow.css';
 
 interface InstructorFlowProps {
@@ -14,12 +14,14 @@ const AUTO_TYPES = [
 ];
 
 const InstructorFlow: React.FC<InstructorFlowProps> = ({ onBack }) => {
-  const { webApp, user } = useTelegram();
+  const { webApp, user, initData } = useTelegram();
   const [step, setStep] = useState<'city' | 'autoType' | 'instructors' | 'form'>('city');
   const [cities, setCities] = useState<City[]>([]);
+  const [bootstrap, setBootstrap] = useState<Bootstrap | null>(null);
   const [selectedCity, setSelectedCity] = useState<City | null>(null);
   const [selectedAutoType, setSelectedAutoType] = useState<string>('');
   const [instructors, setInstructors] = useState<Instructor[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [selectedInstructor, setSelectedInstructor] = useState<Instructor | null>(null);
   const [formData, setFormData] = useState({ name: '', phone: '' });
   const [loading, setLoading] = useState(false);
@@ -32,6 +34,16 @@ const InstructorFlow: React.FC<InstructorFlowProps> = ({ onBack }) => {
   }, [user]);
 
   const loadCities = async () => {
+    if (initData) {
+      try {
+        const data = await api.bootstrap(initData);
+        setBootstrap(data);
+        setCities(data.cities);
+        return;
+      } catch (error) {
+        console.error('Failed to load bootstrap data:', error);
+      }
+    }
     try {
       const data = await api.getCities();
       setCities(data);
@@ -49,8 +61,11 @@ const InstructorFlow: React.FC<InstructorFlowProps> = ({ onBack }) => {
     setSelectedAutoType(autoType);
     setLoading(true);
     try {
-      const data = await api.getInstructors(selectedCity?.name, autoType);
-      setInstructors(data);
+      const data = bootstrap?.instructors && bootstrap.city === selectedCity?.name
+        ? bootstrap.instructors[autoType as Instructor['auto_type']]
+        : await api.getInstructors(selectedCity?.name, autoType);
+      setInstructors(data.results);
+      setNextCursor(data.next_cursor);
       setStep('instructors');
     } catch (error) {
       console.error('Failed to load instructors:', error);
@@ -59,6 +74,20 @@ const InstructorFlow: React.FC<InstructorFlowProps> = ({ onBack }) => {
     }
   };
 
+  const handleLoadMore = async () => {
+    if (!nextCursor) return;
+    setLoading(true);
+    try {
+      const data = await api.getInstructors(selectedCity?.name, selectedAutoType, nextCursor);
+      setInstructors(prev => [...prev, ...data.results]);
+      setNextCursor(data.next_cursor);
+    } catch (error) {
+      console.error('Failed to load instructors:', error);
+    } finally {
+      setLoading(false);
+    }
+  };
+
   const handleInstructorSelect = (instructor: Instructor) => {
     setSelectedInstructor(instructor);
     setStep('form');
@@ -73,12 +102,11 @@ const InstructorFlow: React.FC<InstructorFlowProps> = ({ onBack }) => {
     setLoading(true);
     try {
       await api.createApplication({
-        telegram_id: user?.id || 0,
         instructor: selectedInstructor.id,
         city: selectedCity.id,
         student_name: formData.name,
         student_phone: formData.phone,
-      });
+      }, initData);
 
       webApp?.showAlert('✅ Заявка успешно отправлена!', () => {
         onBack();
@@ -130,7 +158,7 @@ const InstructorFlow: React.FC<InstructorFlowProps> = ({ onBack }) => {
       {step === 'instructors' && (
         <div className="step-content">
           <h2>👨‍🏫 Доступные инструкторы</h2>
-          {loading ? (
+          {loading && instructors.length === 0 ? (
             <div>Загрузка...</div>
           ) : instructors.length === 0 ? (
             <div>В этом городе пока нет доступных инструкторов</div>
@@ -148,6 +176,11 @@ const InstructorFlow: React.FC<InstructorFlowProps> = ({ onBack }) => {
                   <div className="instructor-phone">📞 {instructor.phone}</div>
                 </div>
               ))}
+              {nextCursor && (
+                <button className="option-button" onClick={handleLoadMore} disabled={loading}>
+                  {loading ? 'Загрузка...' : 'Показать ещё'}
+                </button>
+              )}
             </div>
           )}
         </div>
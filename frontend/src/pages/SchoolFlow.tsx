@@ -1,7 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { useTelegram } from '../hooks/useTelegram';
 import api from '../services/api';
-import type { City, School } from '../types';
+import type { Bootstrap, City, School } from '../types';
 import './SchoolFlow.css';
 
 interface SchoolFlowProps {
@@ -19,10 +19,12 @@ const SchoolFlow: React.FC<SchoolFlowProps> = ({ onBack }) => {
   const { webApp, user, initData } = useTelegram();
   const [step, setStep] = useState<'city' | 'category' | 'format' | 'schools' | 'form'>('city');
   const [cities, setCities] = useState<City[]>([]);
+  const [bootstrap, setBootstrap] = useState<Bootstrap | null>(null);
   const [selectedCity, setSelectedCity] = useState<City | null>(null);
   const [selectedCategory, setSelectedCategory] = useState<string>('');
   const [selectedFormat, setSelectedFormat] = useState<string>('');
   const [schools, setSchools] = useState<School[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [selectedSchool, setSelectedSchool] = useState<School | null>(null);
   const [formData, setFormData] = useState({ name: '', phone: '' });
   const [loading, setLoading] = useState(false);
@@ -35,6 +37,16 @@ const SchoolFlow: React.FC<SchoolFlowProps> = ({ onBack }) => {
   }, [user]);
 
   const loadCities = async () => {
+    if (initData) {
+      try {
+        const data = await api.bootstrap(initData);
+        setBootstrap(data);
+        setCities(data.cities);
+        return;
+      } catch (error) {
+        console.error('Failed to load bootstrap data:', error);
+      }
+    }
     try {
       const data = await api.getCities();
       setCities(data);
@@ -57,8 +69,11 @@ const SchoolFlow: React.FC<SchoolFlowProps> = ({ onBack }) => {
     setSelectedFormat(format);
     setLoading(true);
     try {
-      const data = await api.getSchools(selectedCity?.name);
-      setSchools(data);
+      const data = bootstrap?.schools && bootstrap.city === selectedCity?.name
+        ? bootstrap.schools
+        : await api.getSchools(selectedCity?.name);
+      setSchools(data.results);
+      setNextCursor(data.next_cursor);
       setStep('schools');
     } catch (error) {
       console.error('Failed to load schools:', error);
@@ -67,6 +82,20 @@ const SchoolFlow: React.FC<SchoolFlowProps> = ({ onBack }) => {
     }
   };
 
+  const handleLoadMore = async () => {
+    if (!nextCursor) return;
+    setLoading(true);
+    try {
+      const data = await api.getSchools(selectedCity?.name, nextCursor);
+      setSchools(prev => [...prev, ...data.results]);
+      setNextCursor(data.next_cursor);
+    } catch (error) {
+      console.error('Failed to load schools:', error);
+    } finally {
+      setLoading(false);
+    }
+  };
+
   const handleSchoolSelect = (school: School) => {
     setSelectedSchool(school);
     setStep('form');
@@ -81,14 +110,13 @@ const SchoolFlow: React.FC<SchoolFlowProps> = ({ onBack }) => {
     setLoading(true);
     try {
       await api.createApplication({
-        telegram_id: user?.id || 0,
         school: selectedSchool.id,
         city: selectedCity.id,
         category: selectedCategory,
         format: selectedFormat as 'online' | 'offline' | 'hybrid',
         student_name: formData.name,
         student_phone: formData.phone,
-      });
+      }, initData);
 
       webApp?.showAlert('✅ Заявка успешно отправлена!', () => {
         onBack();
@@ -157,7 +185,7 @@ const SchoolFlow: React.FC<SchoolFlowProps> = ({ onBack }) => {
       {step === 'schools' && (
         <div className="step-content">
           <h2>🏫 Доступные автошколы</h2>
-          {loading ? (
+          {loading && schools.length === 0 ? (
             <div>Загрузка...</div>
           ) : schools.length === 0 ? (
             <div>В этом городе пока нет доступных автошкол</div>
@@ -174,6 +202,11 @@ const SchoolFlow: React.FC<SchoolFlowProps> = ({ onBack }) => {
                   <div className="school-address">📍 {school.address}</div>
                 </div>
               ))}
+              {nextCursor && (
+                <button className="option-button" onClick={handleLoadMore} disabled={loading}>
+                  {loading ? 'Загрузка...' : 'Показать ещё'}
+                </button>
+              )}
             </div>
           )}
         </div>
@@ -2,7 +2,7 @@
  * API client for AvtoMat backend
  */
 import axios from 'axios';
-import type { City, School, Instructor, Application, ApplicationCreateData } from '../types';
+import type { City, School, Instructor, Application, ApplicationCreateData, Bootstrap, CursorPage } from '../types';
 
 const API_BASE_URL = process.env.REACT_APP_API_URL || 
   (window.location.protocol === 'https:' 
@@ -16,7 +16,30 @@ const apiClient = axios.create({
   },
 });
 
+// Later requests authenticate with the token from bootstrap / telegramAuth
+let authToken: string | null = null;
+
+const setAuthToken = (token: string) => {
+  authToken = token;
+  apiClient.defaults.headers.common['Authorization'] = `Bearer ${token}`;
+};
+
+// Without a token (bootstrap failed) a request can still authenticate with initData
+const initDataHeaders = (initData?: string) =>
+  !authToken && initData ? { Authorization: `tma ${initData}` } : undefined;
+
 export const api = {
+  // Start data: user, cities, schools and instructors of the user's city, open applications
+  bootstrap: async (initData: string, city?: string): Promise<Bootstrap> => {
+    const params = city ? { city } : {};
+    const response = await apiClient.get('/bootstrap/', {
+      params,
+      headers: { Authorization: `tma ${initData}` },
+    });
+    setAuthToken(response.data.token);
+    return response.data;
+  },
+
   // Cities
   getCities: async (): Promise<City[]> => {
     const response = await apiClient.get('/cities/');
@@ -24,24 +47,27 @@ export const api = {
   },
 
   // Schools
-  getSchools: async (city?: string): Promise<School[]> => {
-    const params = city ? { city } : {};
+  getSchools: async (city?: string, cursor?: string): Promise<CursorPage<School>> => {
+    const params: any = {};
+    if (city) params.city = city;
+    if (cursor) params.cursor = cursor;
     const response = await apiClient.get('/schools/', { params });
     return response.data;
   },
 
   // Instructors
-  getInstructors: async (city?: string, autoType?: string): Promise<Instructor[]> => {
+  getInstructors: async (city?: string, autoType?: string, cursor?: string): Promise<CursorPage<Instructor>> => {
     const params: any = {};
     if (city) params.city = city;
     if (autoType) params.auto_type = autoType;
+    if (cursor) params.cursor = cursor;
     const response = await apiClient.get('/instructors/', { params });
     return response.data;
   },
 
   // Applications
-  createApplication: async (data: ApplicationCreateData): Promise<Application> => {
-    const response = await apiClient.post('/applications/', data);
+  createApplication: async (data: ApplicationCreateData, initData?: string): Promise<Application> => {
+    const response = await apiClient.post('/applications/', data, { headers: initDataHeaders(initData) });
     return response.data;
   },
 
@@ -50,9 +76,12 @@ export const api = {
     return response.data;
   },
 
-  // Telegram Auth
+  // Telegram Auth: the returned token authenticates later requests
   telegramAuth: async (initData: string): Promise<any> => {
     const response = await apiClient.post('/auth/telegram/', { initData });
+    if (response.data.token) {
+      setAuthToken(response.data.token);
+    }
     return response.data;
   },
 };
@@ -59,8 +59,8 @@ export interface Application {
   updated_at: string;
 }
 
+// The student is taken from the Authorization header
 export interface ApplicationCreateData {
-  telegram_id: number;
   school?: number;
   instructor?: number;
   city: number;
@@ -71,5 +71,31 @@ export interface ApplicationCreateData {
   student_phone: string;
 }
 
+// Keyset page of GET /api/schools/ and /api/instructors/
+export interface CursorPage<T> {
+  next_cursor: string | null;
+  prev_cursor: string | null;
+  results: T[];
+}
+
+export interface BootstrapUser {
+  id: number;
+  telegram_id: number;
+  username?: string;
+  first_name: string;
+  last_name?: string;
+}
+
+// GET /api/bootstrap/: everything the first screens need in one request
+export interface Bootstrap {
+  user: BootstrapUser;
+  token: string;
+  city: string | null;
+  cities: City[];
+  schools: CursorPage<School> | null;
+  instructors: Record<Instructor['auto_type'], CursorPage<Instructor>> | null;
+  applications: Application[];
+}
+
 export type FlowType = 'school' | 'instructor' | 'certificate';
 
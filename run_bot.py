@@ -2,20 +2,13 @@
 import sys
 import asyncio
 import logging
-from aiogram import Bot, Dispatcher
-from aiogram.fsm.storage.memory import MemoryStorage
-from bot.config import TELEGRAM_BOT_TOKEN
-from bot.handlers import start, schools, instructors, certificate
+from bot.config import TELEGRAM_BOT_TOKEN, LOG_FILE
+from bot.services.telegram_client import get_bot
+from bot.dispatcher import create_dispatcher
+from bot.utils.logs import setup_logging
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler('bot.log', encoding='utf-8')
-    ]
-)
+setup_logging(log_file=LOG_FILE or 'bot.log')
 logger = logging.getLogger(__name__)
 
 async def main():
@@ -26,20 +19,18 @@ async def main():
     
     try:
         # Initialize bot and dispatcher
-        bot = Bot(token=TELEGRAM_BOT_TOKEN)
-        dp = Dispatcher(storage=MemoryStorage())
+        bot = get_bot()
+        dp = create_dispatcher()
         
-        # Register routers
-        dp.include_router(start.router)
-        dp.include_router(schools.router)
-        dp.include_router(instructors.router)
-        dp.include_router(certificate.router)
+        # Drop conversations abandoned longer than the TTL
+        if hasattr(dp.storage, 'purge_expired'):
+            await dp.storage.purge_expired()
         
         logger.info("Bot started!")
         logger.info(f"Bot token: {TELEGRAM_BOT_TOKEN[:10]}...")
         
-        # Start polling
-        await dp.start_polling(bot)
+        # Start polling; SIGTERM stops it and runs the graceful shutdown hook
+        await dp.start_polling(bot, polling=True)
     except Exception as e:
         logger.error(f"Error starting bot: {e}", exc_info=True)
         raise